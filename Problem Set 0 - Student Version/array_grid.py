@@ -0,0 +1,275 @@
+from array import array
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from grid import Grid, GridView
+
+# Maps the type of the cells to the typecode of the typed array that stores them
+# The cells of any other type (or of mixed types) are stored in a flat list
+TYPECODES = {bool: 'B', int: 'q', float: 'd'}
+
+# Maps the typecodes to the numpy dtypes that share the same memory layout (used by GridFromNumpy and to_numpy)
+NUMPY_DTYPES = {'B': 'bool', 'q': 'int64', 'd': 'float64'}
+
+
+class ArrayGrid(Grid):
+    # The cells are stored row by row in one flat sequence: the cell (x, y) is at index y*width + x
+    # The sequence is a typed array if all the cells have the same type (bool, int or float) and a list otherwise
+    # (or a memoryview over a memory-mapped file, see grid_io.py)
+    __data : Union[array, List[Any], memoryview]
+    # The type of every cell when they are stored in a typed array (None if they are stored in a list)
+    __type : Optional[type]
+
+    def __init__(self, width: int, height: int, fill: Any = None) -> None:
+        self.__width = width
+        self.__height = height
+        self.__fill(fill)
+
+    # Creates the storage with every cell set to the value (a typed array is repeated in bulk without building a list first)
+    def __fill(self, value: Any) -> None:
+        count = self.__width * self.__height
+        if type(value) in TYPECODES:
+            try:
+                self.__data = array(TYPECODES[type(value)], [value]) * count
+                self.__type = type(value)
+                return
+            except OverflowError:
+                pass # An int that does not fit in 64 bits
+        self.__data = [value] * count
+        self.__type = None
+
+    # Stores the flat list of cells in a typed array if possible (otherwise in the list itself)
+    def __store(self, values: List[Any]) -> None:
+        cell_types = set(map(type, values))
+        cell_type = cell_types.pop() if len(cell_types) == 1 else None
+        typecode = TYPECODES.get(cell_type)
+        if typecode is not None:
+            try:
+                self.__data = array(typecode, values)
+                self.__type = cell_type
+                return
+            except OverflowError:
+                pass # An int that does not fit in 64 bits
+        self.__data = values
+        self.__type = None
+
+    # Returns the flat list of the cells (with the bools of a bool grid decoded from bytes)
+    def __values(self, data: Union[array, List[Any], memoryview]) -> List[Any]:
+        values = data if isinstance(data, list) else data.tolist()
+        if self.__type is bool: values = [bool(value) for value in values]
+        return values
+
+    # Switches to list storage so that the grid can hold values of any type
+    # A memory-mapped grid raises a TypeError instead since its cells would no longer be written to the file
+    def __generalize(self) -> None:
+        if isinstance(self.__data, memoryview):
+            raise TypeError(f"Only {self.__type.__name__} values that fit in its cells can be written to a memory-mapped grid")
+        self.__data = self.__values(self.__data)
+        self.__type = None
+
+    @property
+    def width(self) -> int:
+        return self.__width
+
+    @property
+    def height(self) -> int:
+        return self.__height
+
+    # The typecode of the typed array that stores the cells (None if the cells are stored in a list)
+    @property
+    def typecode(self) -> Optional[str]:
+        return None if self.__type is None else TYPECODES[self.__type]
+
+    # The key used to access the grid is a tuple of two integers (x, y) (or slices to get a view, see Grid.__getitem__)
+    def __getitem__(self, key: Tuple[int, int]) -> Any:
+        x, y = key
+        if isinstance(x, slice) or isinstance(y, slice): return GridView(self, x, y)
+        if 0 <= x < self.__width and 0 <= y < self.__height:
+            value = self.__data[y * self.__width + x]
+            return bool(value) if self.__type is bool else value
+        return None
+
+    # The key used to access the grid is a tuple of two integers (x, y)
+    def __setitem__(self, key, value) -> None:
+        x, y = key
+        if 0 <= x < self.__width and 0 <= y < self.__height:
+            if self.__type is not None and type(value) is not self.__type: self.__generalize()
+            index = y * self.__width + x
+            old = self[x, y]
+            try:
+                self.__data[index] = value
+            except (OverflowError, ValueError): # An int that does not fit in 64 bits (a memoryview raises a ValueError)
+                self.__generalize()
+                self.__data[index] = value
+            if self.indexed: self._update_index((x, y), old, value)
+
+    def __str__(self) -> str:
+        return '\n'.join(' '.join(str(cell) for cell in self.row(y)) for y in range(self.__height))
+
+    # Returns the cells of the row y (from left to right)
+    def row(self, y: int) -> List[Any]:
+        return self.__values(self.__data[y * self.__width:(y + 1) * self.__width])
+
+    # Returns the cells of the column x (from top to bottom)
+    def column(self, x: int) -> List[Any]:
+        return self.__values(self.__data[x::self.__width])
+
+    # Returns a memoryview over the typed array (or the mapped file) that stores the cells (None if the cells are stored in a list)
+    def buffer(self) -> Optional[memoryview]:
+        return None if self.__type is None else memoryview(self.__data)
+
+    # Returns every cell of the grid row by row
+    def values(self) -> List[Any]:
+        return self.__values(self.__data)
+
+    # Replaces the cells of the row y with the given values (which must have the same length as the row)
+    def set_row(self, y: int, values: Sequence[Any]) -> None:
+        self.__assign(slice(y * self.__width, (y + 1) * self.__width), values)
+
+    # Replaces the cells of the column x with the given values (which must have the same length as the column)
+    def set_column(self, x: int, values: Sequence[Any]) -> None:
+        self.__assign(slice(x, None, self.__width), values)
+
+    def __assign(self, cells: slice, values: Sequence[Any]) -> None:
+        values = list(values)
+        if self.__type is not None and any(type(value) is not self.__type for value in values): self.__generalize()
+        if isinstance(self.__data, (array, memoryview)): # A typed array (or a mapped file) is only assigned from a typed array
+            try:
+                values = array(self.__data.typecode if isinstance(self.__data, array) else self.__data.format, values)
+            except OverflowError:
+                self.__generalize() # An int that does not fit in 64 bits
+        self.__data[cells] = values
+        if self.indexed: self.build_index()
+
+    # Sets the cells at the given flat indices (the cell (x, y) is at index y*width + x) to the value in one pass
+    # The inverted index is updated for these cells only instead of being rebuilt
+    def set_cells(self, indices: Iterable[int], value: Any) -> None:
+        indices = list(indices)
+        if self.__type is not None and type(value) is not self.__type: self.__generalize()
+        data, width = self.__data, self.__width
+        olds = self.__values([data[index] for index in indices]) if self.indexed else None
+        try:
+            for index in indices: data[index] = value
+        except (OverflowError, ValueError): # An int that does not fit in 64 bits (a memoryview raises a ValueError)
+            self.__generalize()
+            data = self.__data
+            for index in indices: data[index] = value
+        if self.indexed:
+            for index, old in zip(indices, olds):
+                if self.indexed: self._update_index((index % width, index // width), old, value)
+
+    # Sets every cell of the grid to the given value
+    def fill(self, value: Any) -> None:
+        if isinstance(self.__data, memoryview):
+            try:
+                cell = array(self.__data.format, [value]) if type(value) is self.__type else None
+            except OverflowError:
+                cell = None # An int that does not fit in 64 bits
+            if cell is None: self.__generalize() # Raises since the grid would be detached from the file
+            self.__data[:] = cell * len(self.__data) # Written through to the mapped file
+        else:
+            self.__fill(value)
+        if self.indexed: self.build_index()
+
+    # Returns the bytes that a bool or an int value has in the typed array of a bool or int grid (None if it does not fit)
+    # Since equal bools and ints have equal bytes, the cells equal to the value can be found by a byte search
+    def __encode(self, value: Any) -> Optional[bytes]:
+        if self.__type not in (bool, int) or type(value) not in (bool, int): return None
+        try:
+            return array(self.typecode, [value]).tobytes()
+        except OverflowError:
+            return b''
+
+    # Yields the flat indices of the cells equal to the value (in increasing order)
+    # The scan runs at C speed: a byte search for bool and int cells and the index method of the array (or list) otherwise
+    def __search(self, value: Any) -> Iterator[int]:
+        needle = self.__encode(value)
+        if needle is not None:
+            if not needle: return # The value does not fit in the typed array so no cell can be equal to it
+            haystack = self.__data.tobytes()
+            index = haystack.find(needle)
+            while index != -1:
+                if index % len(needle) == 0: # Skip the matches that span two cells
+                    yield index // len(needle)
+                    index = haystack.find(needle, index + len(needle))
+                else:
+                    index = haystack.find(needle, index + 1)
+            return
+        data = self.__data.tolist() if isinstance(self.__data, memoryview) else self.__data
+        index = -1
+        try:
+            while True:
+                index = data.index(value, index + 1)
+                yield index
+        except ValueError:
+            pass # No more occurrences
+
+    # Returns the number of cells equal to the value
+    def count(self, value: Any) -> int:
+        needle = self.__encode(value)
+        if needle is not None and len(needle) == 1: return self.__data.tobytes().count(needle)
+        if needle is not None or isinstance(self.__data, memoryview): return sum(1 for _ in self.__search(value))
+        return self.__data.count(value)
+
+    # Returns the positions (x, y) of the cells equal to the value
+    def positions(self, value: Any) -> Set[Tuple[int, int]]:
+        width = self.__width
+        return {(index % width, index // width) for index in self.__search(value)}
+
+    # Returns a bool grid where each cell is True if the corresponding cell of this grid is equal to the value
+    def equals(self, value: Any) -> 'ArrayGrid':
+        mask = ArrayGrid(self.__width, self.__height, False)
+        for index in self.__search(value): mask.__data[index] = 1
+        return mask
+
+    # Returns a dense (list of lists) copy of this grid
+    def to_grid(self) -> Grid:
+        return Grid.GridFromArray([self.row(y) for y in range(self.__height)])
+
+    # Returns a numpy array of shape (height, width) that shares the memory of this grid if the cells are in a typed array
+    def to_numpy(self):
+        import numpy # Only this method needs numpy, so a grid can be used without it
+        if self.__type is None: return numpy.array(self.__data, dtype=object).reshape(self.__height, self.__width)
+        return numpy.frombuffer(self.__data, dtype=NUMPY_DTYPES[self.typecode]).reshape(self.__height, self.__width)
+
+    # This static method creates a grid from a list of lists (the missing cells of the short rows are None)
+    @staticmethod
+    def GridFromArray(array: List[List[Any]]) -> 'ArrayGrid':
+        height = len(array)
+        width = 0 if height == 0 else max(len(row) for row in array)
+        values = []
+        for row in array:
+            values.extend(row)
+            if len(row) < width: values.extend([None] * (width - len(row)))
+        return ArrayGrid.GridFromValues(width, height, values)
+
+    # This static method creates a grid from a flat sequence of cells stored row by row
+    @staticmethod
+    def GridFromValues(width: int, height: int, values: Iterable[Any]) -> 'ArrayGrid':
+        grid = ArrayGrid(0, 0)
+        grid.__width, grid.__height = width, height
+        grid.__store(list(values))
+        if len(grid.__data) != width * height: raise ValueError(f"Expected {width * height} cells but got {len(grid.__data)}")
+        return grid
+
+    # This static method creates a grid from any grid (such as a dense Grid)
+    @staticmethod
+    def GridFromGrid(grid: Grid) -> 'ArrayGrid':
+        return ArrayGrid.GridFromValues(grid.width, grid.height, (grid[x, y] for y in range(grid.height) for x in range(grid.width)))
+
+    # This static method creates a grid that uses the given buffer (such as a typed array or a memoryview) as its storage without copying it
+    @staticmethod
+    def GridFromBuffer(width: int, height: int, buffer: Union[array, memoryview], cell_type: type) -> 'ArrayGrid':
+        if len(buffer) != width * height: raise ValueError(f"Expected {width * height} cells but got {len(buffer)}")
+        grid = ArrayGrid(0, 0)
+        grid.__width, grid.__height = width, height
+        grid.__data = buffer
+        grid.__type = cell_type
+        return grid
+
+    # This static method creates a grid from a 2D numpy array (bool, int64 and float64 arrays are copied in bulk)
+    @staticmethod
+    def GridFromNumpy(ndarray) -> 'ArrayGrid':
+        height, width = ndarray.shape
+        for cell_type, typecode in TYPECODES.items():
+            if str(ndarray.dtype) == NUMPY_DTYPES[typecode]:
+                return ArrayGrid.GridFromBuffer(width, height, array(typecode, ndarray.tobytes()), cell_type)
+        return ArrayGrid.GridFromValues(width, height, ndarray.ravel().tolist())
@@ -1,3 +1,21 @@
+from typing import Dict, Optional
+
+# The points of each letter grade (any other grade is worth 0 points)
+GRADE_POINTS = {
+    "A+": 4.0,
+    "A" : 4.0,
+    "A-": 3.7,
+    "B+": 3.5,
+    "B" : 3.3,
+    "B-": 3.0,
+    "C+": 2.7,
+    "C" : 2.5,
+    "C-": 2.3,
+    "D" : 2.0,
+    "F" : 0.0
+}
+
+
 class Student:
     def __init__(self, id: str, name: str) -> None:
         self.id = id
@@ -5,27 +23,56 @@ class Student:
     
 
 class Course:
-    def __init__(self, id: str, name: str, hours: int, grades = None) -> None:
+    def __init__(self, id: str, name: str, hours: int, grades = None, registry: Optional['GPARegistry'] = None) -> None:
         self.id = id
         self.name = name
         self.hours = hours
         self.grades = grades or {}
+        self.registry = None
+        if registry is not None: registry.register(self)
     
     def add_grade(self, student: Student, grade: str):
+        if self.registry is not None: self.registry.record(student.id, self.hours, self.grades.get(student.id), grade)
         self.grades[student.id] = grade
     
     @staticmethod
     def convert_grade_to_points(grade: str) -> float:
-        return {
-            "A+": 4.0,
-            "A" : 4.0,
-            "A-": 3.7,
-            "B+": 3.5,
-            "B" : 3.3,
-            "B-": 3.0,
-            "C+": 2.7,
-            "C" : 2.5,
-            "C-": 2.3,
-            "D" : 2.0,
-            "F" : 0.0
-        }.get(grade, 0)
\ No newline at end of file
+        return GRADE_POINTS.get(grade, 0)
+
+
+class GPARegistry:
+    # The registry keeps the running totals of every student over the registered courses so that a GPA query is O(1)
+    # The weighted points are kept in tenths of a point (every grade has one decimal) so that regrades,
+    # which subtract the old grade and add the new one, never accumulate rounding errors
+    # The registered courses must be modified through Course.add_grade (and their hours must not change)
+    __points : Dict[str, int]
+    __hours : Dict[str, int]
+
+    def __init__(self) -> None:
+        self.__points = {}
+        self.__hours = {}
+
+    # Adds the grades that the course already has to the totals and keeps the totals up to date on its next grades
+    def register(self, course: Course) -> None:
+        if course.registry is self: return
+        if course.registry is not None: raise ValueError(f"The course {course.id} is already registered in another registry")
+        course.registry = self
+        for student_id, grade in course.grades.items(): self.record(student_id, course.hours, None, grade)
+
+    # Replaces the old grade (None for a new grade) of the student in a course of the given hours with the new grade
+    def record(self, student_id: str, hours: int, old_grade: Optional[str], new_grade: str) -> None:
+        points = round(Course.convert_grade_to_points(new_grade) * 10) * hours
+        if old_grade is None:
+            self.__hours[student_id] = self.__hours.get(student_id, 0) + hours
+        else:
+            points -= round(Course.convert_grade_to_points(old_grade) * 10) * hours
+        self.__points[student_id] = self.__points.get(student_id, 0) + points
+
+    # Returns the GPA of the student over the registered courses (0 if the student has no grades)
+    def gpa(self, student: Student) -> float:
+        hours = self.__hours.get(student.id, 0)
+        return self.__points[student.id] / (10 * hours) if hours != 0 else 0.0
+
+    # Returns the number of hours the student has grades in
+    def hours(self, student: Student) -> int:
+        return self.__hours.get(student.id, 0)
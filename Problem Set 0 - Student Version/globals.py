@@ -1,2 +1,38 @@
-from college import Student, Course
-from grid import Grid
\ No newline at end of file
+# The names used by the test cases are only imported when the autograder first looks them up (see resolve_names in autograder.py)
+# so grading some of the problems does not pay for importing the modules (and the dependencies) of the other problems
+import importlib
+
+# Maps each name to the module it comes from and the attribute of that module (or None for the module itself)
+LAZY_NAMES = {
+    "Student": ("college", "Student"),
+    "Course": ("college", "Course"),
+    "Grid": ("grid", "Grid"),
+    "ArrayGrid": ("array_grid", "ArrayGrid"),
+    "SparseGrid": ("sparse_grid", "SparseGrid"),
+    "StreamingHistogram": ("histogram", "StreamingHistogram"),
+    "ApproximateHistogram": ("histogram", "ApproximateHistogram"),
+    "palindrome_check": ("palindrome_check", "palindrome_check"),
+    "PalindromeIndex": ("palindrome_check", "PalindromeIndex"),
+    "Gradebook": ("gradebook", "Gradebook"),
+}
+# The public names of these modules are available too (as if they were imported with "from module import *")
+# They are searched in order so a name found in an earlier module hides the same name in the later ones
+LAZY_MODULES = []
+# The dependencies that the problem modules only import on first use (a resident autograder daemon loads them up front)
+PRELOAD_MODULES = []
+
+def __getattr__(name: str):
+    if name in LAZY_NAMES:
+        module_name, attribute = LAZY_NAMES[name]
+        value = importlib.import_module(module_name)
+        if attribute is not None: value = getattr(value, attribute)
+    else:
+        for module_name in LAZY_MODULES:
+            module = importlib.import_module(module_name)
+            if name in getattr(module, "__all__", (key for key in vars(module) if not key.startswith("_"))):
+                value = getattr(module, name)
+                break
+        else:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
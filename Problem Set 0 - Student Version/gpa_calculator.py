@@ -14,6 +14,11 @@ def calculate_gpa(student: Student, courses: List[Course]) -> float:
     '''
 
     # TODO: ADD YOUR CODE HERE
-    return (sum([Course.convert_grade_to_points(course.grades[student.id]) * course.hours for course in courses if student.id in course.grades]) / sum(
-        [course.hours for course in courses if student.id in course.grades])) if sum(
-        [course.hours for course in courses if student.id in course.grades]) != 0.0 else 0.0
+    # The courses are walked once, summing the weighted points and the hours of the courses the student has a grade in
+    points, hours = 0.0, 0
+    for course in courses:
+        grade = course.grades.get(student.id)
+        if grade is not None:
+            points += Course.convert_grade_to_points(grade) * course.hours
+            hours += course.hours
+    return points / hours if hours != 0 else 0.0
@@ -0,0 +1,130 @@
+import csv
+import heapq
+from array import array
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple, Union
+from college import GRADE_POINTS, Student, Course
+
+
+class Gradebook:
+    # The grades are stored in columns: the i-th grade is the grade of the student __student_column[i] in the course __course_column[i]
+    # Students and courses are numbered in the order they are first seen, and the columns are typed arrays of these numbers
+    # The points are kept in tenths of a point (every grade has one decimal) like in GPARegistry
+    __student_ids : List[str]
+    __student_numbers : Dict[str, int]
+    __course_ids : List[str]
+    __course_numbers : Dict[str, int]
+    __course_hours : array
+    __student_column : array
+    __course_column : array
+    __points_column : array
+    __grades : Dict[Tuple[int, int], int] # Maps (student number, course number) to the row of the grade so that regrades overwrite it
+
+    def __init__(self) -> None:
+        self.__student_ids, self.__student_numbers = [], {}
+        self.__course_ids, self.__course_numbers = [], {}
+        self.__course_hours = array('q')
+        self.__student_column, self.__course_column, self.__points_column = array('q'), array('q'), array('q')
+        self.__grades = {}
+
+    # Returns the number of the student (a new number is given to a new student)
+    def __student_number(self, student_id: str) -> int:
+        number = self.__student_numbers.get(student_id)
+        if number is None:
+            number = self.__student_numbers[student_id] = len(self.__student_ids)
+            self.__student_ids.append(student_id)
+        return number
+
+    # Adds the course (or checks that its hours did not change) and returns its number
+    def add_course(self, course_id: str, hours: int) -> int:
+        number = self.__course_numbers.get(course_id)
+        if number is None:
+            number = self.__course_numbers[course_id] = len(self.__course_ids)
+            self.__course_ids.append(course_id)
+            self.__course_hours.append(hours)
+        elif self.__course_hours[number] != hours:
+            raise ValueError(f"The course {course_id} has {self.__course_hours[number]} hours, not {hours}")
+        return number
+
+    # Sets the grade of the student in the course (a second grade for the same course replaces the first one)
+    # The hours can be left out if the course was already added
+    def add_grade(self, student: Union[Student, str], course_id: str, grade: str, hours: Optional[int] = None) -> None:
+        student = self.__student_number(student.id if isinstance(student, Student) else student)
+        course = self.__course_numbers[course_id] if hours is None else self.add_course(course_id, hours)
+        points = round(Course.convert_grade_to_points(grade) * 10)
+        row = self.__grades.get((student, course))
+        if row is None:
+            self.__grades[student, course] = len(self.__points_column)
+            self.__student_column.append(student)
+            self.__course_column.append(course)
+            self.__points_column.append(points)
+        else:
+            self.__points_column[row] = points
+
+    # Adds the course and all of its grades
+    def add(self, course: Course) -> None:
+        self.add_course(course.id, course.hours)
+        for student_id, grade in course.grades.items(): self.add_grade(student_id, course.id, grade)
+
+    # The number of grades in the gradebook
+    def __len__(self) -> int:
+        return len(self.__points_column)
+
+    # Returns the GPA of every student who has a grade (0 for the students who only have grades in courses of 0 hours)
+    # The weighted points and the hours of all the students are summed in one pass over the columns (with numpy if it is installed)
+    def gpas(self) -> Dict[str, float]:
+        count = len(self.__student_ids)
+        try:
+            import numpy # imported on first use since numpy is optional and slow to import
+        except ImportError:
+            numpy = None
+        if numpy is not None:
+            students = numpy.frombuffer(self.__student_column, dtype=numpy.int64)
+            hours = numpy.frombuffer(self.__course_hours, dtype=numpy.int64)[numpy.frombuffer(self.__course_column, dtype=numpy.int64)]
+            points = numpy.bincount(students, weights=numpy.frombuffer(self.__points_column, dtype=numpy.int64) * hours, minlength=count)
+            totals = numpy.bincount(students, weights=hours, minlength=count)
+            gpas = numpy.divide(points, 10 * totals, out=numpy.zeros(count), where=totals != 0).tolist()
+        else:
+            points, totals = array('q', [0]) * count, array('q', [0]) * count
+            course_hours = self.__course_hours
+            for student, course, grade_points in zip(self.__student_column, self.__course_column, self.__points_column):
+                hours = course_hours[course]
+                points[student] += grade_points * hours
+                totals[student] += hours
+            gpas = [weighted / (10 * hours) if hours != 0 else 0.0 for weighted, hours in zip(points, totals)]
+        return dict(zip(self.__student_ids, gpas))
+
+    # Returns the k students with the highest GPAs as (student id, GPA) pairs from the highest to the lowest
+    # (ties are broken by the order in which the students were first seen)
+    def top_k(self, k: int) -> List[Tuple[str, float]]:
+        gpas = self.gpas()
+        return heapq.nlargest(k, gpas.items(), key=lambda item: item[1])
+
+    # Returns the courses as Course objects (named by their ids, with their grades rebuilt from the columns) to be used with the rest of the code
+    def courses(self) -> List[Course]:
+        courses = [Course(course_id, course_id, hours) for course_id, hours in zip(self.__course_ids, self.__course_hours)]
+        for (student, course), row in self.__grades.items():
+            courses[course].grades[self.__student_ids[student]] = self.__letter(self.__points_column[row])
+        return courses
+
+    # Returns a letter grade that has the given points in tenths (the letters that have the same points are equivalent for the GPA)
+    @staticmethod
+    def __letter(points: int) -> str:
+        return next((grade for grade, grade_points in GRADE_POINTS.items() if round(grade_points * 10) == points), "F")
+
+    # This static method creates a gradebook from Course objects
+    @staticmethod
+    def GradebookFromCourses(courses: Iterable[Course]) -> 'Gradebook':
+        gradebook = Gradebook()
+        for course in courses: gradebook.add(course)
+        return gradebook
+
+    # This static method creates a gradebook from a CSV file with the columns student_id, course_id, hours and grade
+    # The rows are read one at a time so only the columns are kept in memory
+    @staticmethod
+    def GradebookFromCSV(file: Union[str, TextIO]) -> 'Gradebook':
+        if isinstance(file, str):
+            with open(file, newline='') as opened: return Gradebook.GradebookFromCSV(opened)
+        gradebook = Gradebook()
+        for row in csv.DictReader(file):
+            gradebook.add_grade(row["student_id"], row["course_id"], row["grade"], int(row["hours"]))
+        return gradebook
@@ -1,10 +1,13 @@
-from typing import Any, List, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 
 class Grid:
     # Th following line defines the data type for the instance variable "__data"
     # This type hint means the "__data" is a list of lists containing any type of data 
     __data : List[List[Any]]
+    # The optional inverted index maps each value to the positions (x, y) of the cells that contain it
+    # It is None unless build_index is called and, once built, __setitem__ keeps it up to date
+    __index : Optional[Dict[Any, Set[Tuple[int, int]]]] = None
 
     def __init__(self, width: int, height: int) -> None:
         self.__data = [[None]*width for _ in range(height)]
@@ -18,8 +21,10 @@ class Grid:
         return len(self.__data)
     
     # The key used to access the grid is a tuple of two integers (x, y)
+    # If x or y is a slice (such as grid[x0:x1, y0:y1]), a view that shares the cells of this grid is returned
     def __getitem__(self, key: Tuple[int, int]) -> Any:
         x, y = key
+        if isinstance(x, slice) or isinstance(y, slice): return GridView(self, x, y)
         if 0 <= y < len(self.__data):
             row = self.__data[y]
             if 0 <= x < len(row):
@@ -32,7 +37,54 @@ class Grid:
         if 0 <= y < len(self.__data):
             row = self.__data[y]
             if 0 <= x < len(row):
-                row[x] = value
+                old, row[x] = row[x], value
+                if self.__index is not None: self._update_index((x, y), old, value)
+    
+    # Builds the inverted index of the values so that locating a value costs O(number of its cells) instead of O(width*height)
+    # The index costs a set entry per cell so it pays off when the grid is queried many times between updates
+    # A grid that contains an unhashable value cannot be indexed so it is left unindexed (and is scanned instead)
+    def build_index(self) -> None:
+        index = {}
+        try:
+            for y in range(self.height):
+                for x in range(self.width):
+                    index.setdefault(self[x, y], set()).add((x, y))
+        except TypeError:
+            index = None
+        self.__index = index
+    
+    # Removes the inverted index (the grid is no longer indexed)
+    def drop_index(self) -> None:
+        self.__index = None
+    
+    @property
+    def indexed(self) -> bool:
+        return self.__index is not None
+    
+    # Returns the positions of the cells equal to the value using the inverted index
+    # (or None if the grid is not indexed or the value is unhashable, so the caller scans the grid instead)
+    def indexed_positions(self, value: Any) -> Optional[Set[Tuple[int, int]]]:
+        if self.__index is None: return None
+        try:
+            return set(self.__index.get(value, ()))
+        except TypeError:
+            return None
+    
+    # Returns the distinct values in the inverted index (or None if the grid is not indexed)
+    def indexed_values(self) -> Optional[List[Any]]:
+        if self.__index is None: return None
+        return list(self.__index)
+    
+    # Moves the position from the entry of the old value to the entry of the new value
+    # (called once the cell is written so that a failed write leaves the index unchanged)
+    def _update_index(self, position: Tuple[int, int], old: Any, new: Any) -> None:
+        positions = self.__index[old]
+        positions.discard(position)
+        if not positions: del self.__index[old]
+        try:
+            self.__index.setdefault(new, set()).add(position)
+        except TypeError:
+            self.__index = None # The new value is unhashable so it cannot be indexed
     
     # This function is called whenever we convert the grid into a string
     # This is useful for printing
@@ -48,4 +100,55 @@ class Grid:
         for y, row in enumerate(array):
             for x, cell in enumerate(row):
                 grid[x, y] = cell
-        return grid
\ No newline at end of file
+        return grid
+
+class GridView(Grid):
+    # A view is a rectangular region of a parent grid that does not copy its cells: reads and writes go to the parent
+    # The columns and rows of the region are stored as ranges of the coordinates in the parent
+    __parent : Grid
+    __columns : range
+    __rows : range
+
+    def __init__(self, parent: Grid, x: Union[int, slice], y: Union[int, slice]) -> None:
+        # A view of a view refers to the original grid so that accessing a cell never goes through a chain of views
+        if isinstance(parent, GridView):
+            self.__parent, self.__columns, self.__rows = parent.__parent, parent.__columns, parent.__rows
+        else:
+            self.__parent, self.__columns, self.__rows = parent, range(parent.width), range(parent.height)
+        self.__columns = GridView.__select(self.__columns, x)
+        self.__rows = GridView.__select(self.__rows, y)
+
+    # Returns the part of the range selected by the slice (or by the integer, which selects a single column or row)
+    @staticmethod
+    def __select(coordinates: range, key: Union[int, slice]) -> range:
+        if isinstance(key, slice): return coordinates[key]
+        return coordinates[key:key + 1] if 0 <= key < len(coordinates) else range(0)
+
+    @property
+    def width(self) -> int:
+        return len(self.__columns)
+
+    @property
+    def height(self) -> int:
+        return len(self.__rows)
+
+    # The key used to access the view is a tuple of two integers (x, y) relative to the top left corner of the view
+    def __getitem__(self, key: Tuple[int, int]) -> Any:
+        x, y = key
+        if isinstance(x, slice) or isinstance(y, slice): return GridView(self, x, y)
+        if 0 <= x < len(self.__columns) and 0 <= y < len(self.__rows):
+            return self.__parent[self.__columns[x], self.__rows[y]]
+        return None
+
+    # The key used to access the view is a tuple of two integers (x, y) relative to the top left corner of the view
+    def __setitem__(self, key, value) -> None:
+        x, y = key
+        if 0 <= x < len(self.__columns) and 0 <= y < len(self.__rows):
+            self.__parent[self.__columns[x], self.__rows[y]] = value
+
+    # A view cannot keep an index up to date since its cells can also be modified through the parent
+    def build_index(self) -> None:
+        raise TypeError("A grid view cannot be indexed (index its parent instead)")
+
+    def __str__(self) -> str:
+        return '\n'.join(' '.join(str(self[x, y]) for x in range(self.width)) for y in range(self.height))
@@ -0,0 +1,126 @@
+import mmap
+import struct
+import sys
+from array import array
+from typing import Any, Optional
+from grid import Grid
+from array_grid import ArrayGrid, TYPECODES
+from sparse_grid import SparseGrid
+
+# The file starts with a header of 24 bytes (little endian):
+#   magic (4 bytes), version (1 byte), typecode of the cells (1 byte: 'B' for bools, 'q' for ints, 'd' for floats),
+#   layout (1 byte: DENSE or SPARSE), whether the sparse default value is None (1 byte), width (8 bytes), height (8 bytes)
+# A dense file is followed by the cells row by row (the cell (x, y) is at index y*width + x)
+# A sparse file is followed by the number of stored cells n (8 bytes), the default value (one cell, 0 if it is None),
+# then n x coordinates, n y coordinates (8 bytes each) and n values
+HEADER = struct.Struct('<4sBcB?QQ')
+MAGIC = b'GRID'
+VERSION = 1
+DENSE, SPARSE = 0, 1
+SPARSE_HEADER = struct.Struct('<Q')
+
+# Maps the typecodes back to the type of the cells
+CELL_TYPES = {typecode: cell_type for cell_type, typecode in TYPECODES.items()}
+
+
+# Returns the typecode of the values (which must all be bools, all ints or all floats)
+def typecode_of(values: Any, fallback: Any = None) -> str:
+    cell_types = set(map(type, values))
+    if not cell_types and type(fallback) in TYPECODES: return TYPECODES[type(fallback)]
+    if not cell_types: return TYPECODES[bool]
+    if len(cell_types) != 1 or next(iter(cell_types)) not in TYPECODES:
+        raise ValueError(f"Only grids whose cells are all bools, all ints or all floats can be saved (found {sorted(t.__name__ for t in cell_types)})")
+    return TYPECODES[cell_types.pop()]
+
+
+# Writes the values (an array or a memoryview) to the file as little endian bytes (they are only copied on big endian machines)
+def write_values(file, values: Any) -> None:
+    if sys.byteorder == 'big':
+        values = array(values.typecode if isinstance(values, array) else values.format, values)
+        values.byteswap()
+    file.write(values)
+
+
+# Reads n values of the typecode from the file
+def read_values(file, typecode: str, count: int) -> array:
+    values = array(typecode)
+    values.fromfile(file, count)
+    if sys.byteorder == 'big': values.byteswap()
+    return values
+
+
+# Converts the raw values of a bool grid back into bools
+def decode(values: Any, typecode: str) -> list:
+    values = values.tolist()
+    return [bool(value) for value in values] if typecode == TYPECODES[bool] else values
+
+
+def save_grid(grid: Grid, path: str, sparse: Optional[bool] = None) -> None:
+    '''
+    This function saves the grid in a compact binary file
+    The cells must all be bools, all ints or all floats
+    A sparse grid is saved in the sparse layout (only its stored cells are written) unless "sparse" is False
+    '''
+    if sparse is None: sparse = isinstance(grid, SparseGrid)
+    with open(path, 'wb') as file:
+        if sparse:
+            if not isinstance(grid, SparseGrid): grid = SparseGrid.GridFromGrid(grid)
+            positions, values = zip(*grid.items()) if len(grid) else ((), ())
+            typecode = typecode_of(values, grid.default)
+            if grid.default is not None and type(grid.default) is not CELL_TYPES[typecode]:
+                raise ValueError(f"The default value {grid.default!r} must have the same type as the cells")
+            file.write(HEADER.pack(MAGIC, VERSION, typecode.encode(), SPARSE, grid.default is None, grid.width, grid.height))
+            file.write(SPARSE_HEADER.pack(len(values)))
+            write_values(file, array(typecode, [0 if grid.default is None else grid.default]))
+            write_values(file, array('q', (x for x, _ in positions)))
+            write_values(file, array('q', (y for _, y in positions)))
+            write_values(file, array(typecode, values))
+        else:
+            if not isinstance(grid, ArrayGrid): grid = ArrayGrid.GridFromGrid(grid)
+            if grid.buffer() is None: grid = ArrayGrid.GridFromValues(grid.width, grid.height, grid.values()) # The cells may have been generalized to a list
+            buffer = grid.buffer()
+            if buffer is None and grid.width * grid.height == 0: buffer = memoryview(array(TYPECODES[bool]))
+            if buffer is None:
+                typecode_of(grid.values()) # Raises an error that names the types of the cells
+                raise ValueError("Only grids whose ints fit in 64 bits can be saved")
+            file.write(HEADER.pack(MAGIC, VERSION, buffer.format.encode(), DENSE, False, grid.width, grid.height))
+            write_values(file, buffer)
+
+
+def load_grid(path: str, backend: type = ArrayGrid, memory_map: bool = False, writable: bool = False, default: Any = None) -> Grid:
+    '''
+    This function loads a grid saved by save_grid into the given backend (ArrayGrid, Grid or SparseGrid)
+    If "memory_map" is True, the cells of a dense file are not read: the returned ArrayGrid maps the file into memory
+    so the grid is opened instantly and its pages are read lazily (writes go to the file if "writable" is True)
+    The "default" value is the default of the SparseGrid created from a dense file
+    '''
+    with open(path, 'r+b' if writable else 'rb') as file:
+        magic, version, typecode, layout, no_default, width, height = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC: raise ValueError(f"{path} is not a grid file")
+        if version != VERSION: raise ValueError(f"{path} has an unsupported version ({version})")
+        typecode = typecode.decode()
+        cell_type = CELL_TYPES[typecode]
+        if memory_map:
+            if layout != DENSE or backend is not ArrayGrid: raise ValueError("Only dense files can be memory-mapped into an ArrayGrid")
+            if sys.byteorder != 'little': raise ValueError("Grid files can only be memory-mapped on little endian machines")
+            if width * height == 0: return ArrayGrid.GridFromBuffer(width, height, array(typecode), cell_type)
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+            return ArrayGrid.GridFromBuffer(width, height, memoryview(mapped)[HEADER.size:].cast(typecode), cell_type)
+        if layout == DENSE:
+            grid = ArrayGrid.GridFromBuffer(width, height, read_values(file, typecode, width * height), cell_type)
+            if backend is ArrayGrid: return grid
+            if backend is SparseGrid: return SparseGrid.GridFromGrid(grid, default)
+            return grid.to_grid()
+        count, = SPARSE_HEADER.unpack(file.read(SPARSE_HEADER.size))
+        default = decode(read_values(file, typecode, 1), typecode)[0]
+        if no_default: default = None
+        xs, ys = read_values(file, 'q', count), read_values(file, 'q', count)
+        values = decode(read_values(file, typecode, count), typecode)
+    if backend is SparseGrid:
+        grid = SparseGrid(width, height, default)
+    elif backend is ArrayGrid:
+        grid = ArrayGrid(width, height, default)
+    else:
+        grid = Grid.GridFromArray([[default] * width for _ in range(height)])
+    for x, y, value in zip(xs, ys, values): grid[x, y] = value
+    return grid
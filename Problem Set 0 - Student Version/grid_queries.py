@@ -0,0 +1,171 @@
+from itertools import groupby
+from typing import Any, Iterable, List, Set, Tuple
+from grid import Grid
+from array_grid import ArrayGrid
+from locator import flat_values
+
+# The offsets (dx, dy) of the neighbors of a cell for each connectivity
+OFFSETS = {
+    4: [(0, -1), (-1, 0), (1, 0), (0, 1)],
+    8: [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+}
+
+# These queries work on the flat list of the cells (the cell (x, y) is at index y*width + x) instead of calling __getitem__ per cell
+# An ArrayGrid hands over this list in one call and receives its results in bulk (see locator.flat_values)
+
+
+def neighborhood(grid: Grid, connectivity: int = 4, fill: Any = None) -> List[ArrayGrid]:
+    '''
+    This function returns one grid per neighbor offset (in the order of OFFSETS[connectivity])
+    where the cell (x, y) holds the value of the neighbor (x+dx, y+dy) of the cell (x, y) in the given grid (or "fill" if it is outside)
+    Each grid is built by shifting whole rows with slices
+    '''
+    width, height = grid.width, grid.height
+    values = flat_values(grid)
+    rows = [values[y * width:(y + 1) * width] for y in range(height)]
+    gathered = []
+    for dx, dy in OFFSETS[connectivity]:
+        shifted = []
+        for y in range(height):
+            if not 0 <= y + dy < height:
+                shifted.extend([fill] * width)
+                continue
+            row = rows[y + dy]
+            if dx >= 0: shifted.extend(row[dx:] + [fill] * min(dx, width))
+            else: shifted.extend([fill] * min(-dx, width) + row[:dx])
+        gathered.append(ArrayGrid.GridFromValues(width, height, shifted))
+    return gathered
+
+
+# Yields the flat indices of the neighbors of the cell at the flat index
+def neighbor_indices(index: int, width: int, height: int, offsets: List[Tuple[int, int]]):
+    y, x = divmod(index, width)
+    for dx, dy in offsets:
+        if 0 <= x + dx < width and 0 <= y + dy < height: yield index + dy * width + dx
+
+
+# Returns the distance from the nearest source to each flat index reached by a breadth-first search (-1 if it is not reached)
+# A cell is entered if it is True in "passable" (the flat list of the cells that can be entered)
+# The frontier is expanded in bulk with numpy if it is installed (one vectorized step per distance instead of one per cell)
+def breadth_first(passable: List[bool], width: int, height: int, sources: Iterable[int], connectivity: int) -> List[int]:
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    sources = list(sources)
+    if numpy is not None:
+        mask = numpy.array(passable, dtype=bool)
+        distances = numpy.full(len(passable), -1, dtype=numpy.int64)
+        frontier = numpy.unique(numpy.array(sources, dtype=numpy.int64))
+        distances[frontier] = 0
+        distance = 0
+        while frontier.size:
+            distance += 1
+            ys, xs = numpy.divmod(frontier, width)
+            neighbors = numpy.concatenate([frontier[(0 <= xs + dx) & (xs + dx < width) & (0 <= ys + dy) & (ys + dy < height)] + (dy * width + dx)
+                                           for dx, dy in OFFSETS[connectivity]])
+            neighbors = numpy.unique(neighbors[mask[neighbors] & (distances[neighbors] == -1)])
+            distances[neighbors] = distance
+            frontier = neighbors
+        return distances.tolist()
+    offsets = OFFSETS[connectivity]
+    distances = [-1] * len(passable)
+    frontier = []
+    for source in sources:
+        if distances[source] == -1:
+            distances[source] = 0
+            frontier.append(source)
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for index in frontier:
+            for neighbor in neighbor_indices(index, width, height, offsets):
+                if distances[neighbor] == -1 and passable[neighbor]:
+                    distances[neighbor] = distance
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return distances
+
+
+def flood_fill(grid: Grid, seed: Tuple[int, int], value: Any, connectivity: int = 4) -> Set[Tuple[int, int]]:
+    '''
+    This function sets the cells that are connected to the seed and equal to it to the given value
+    It returns the positions of the filled cells (an ArrayGrid is written back in one bulk call, see ArrayGrid.set_cells)
+    '''
+    width, height = grid.width, grid.height
+    x, y = seed
+    if not (0 <= x < width and 0 <= y < height): return set()
+    values = flat_values(grid)
+    target = values[y * width + x]
+    distances = breadth_first([cell == target for cell in values], width, height, [y * width + x], connectivity)
+    filled = [index for index, distance in enumerate(distances) if distance != -1]
+    if isinstance(grid, ArrayGrid):
+        grid.set_cells(filled, value)
+    else:
+        for index in filled: grid[index % width, index // width] = value
+    return {(index % width, index // width) for index in filled}
+
+
+def label_components(grid: Grid, connectivity: int = 4, background: Any = None) -> Tuple[ArrayGrid, int]:
+    '''
+    This function labels the connected components of equal cells (the cells equal to "background" are not labelled)
+    It returns a grid of ints where each cell holds the label of its component (from 1, in row-major order, and 0 for the background)
+    and the number of components
+    The rows are processed as runs of equal cells, which are merged with the overlapping runs of the row above
+    '''
+    width, height = grid.width, grid.height
+    values = flat_values(grid)
+    reach = 1 if connectivity == 8 else 0 # Diagonal runs touch if they overlap once extended by one cell
+    parents = [] # The union-find forest of the runs
+    def find(run: int) -> int:
+        while parents[run] != run:
+            parents[run] = parents[parents[run]]
+            run = parents[run]
+        return run
+    all_runs, previous = [], []
+    for y in range(height):
+        runs, start = [], 0
+        for cell, group in groupby(values[y * width:(y + 1) * width]):
+            end = start + sum(1 for _ in group)
+            if cell != background:
+                runs.append((start, end, cell, len(parents)))
+                parents.append(len(parents))
+            start = end
+        # Merge with the runs of the row above that overlap (both lists are sorted so they are walked together)
+        above = 0
+        for start, end, cell, run in runs:
+            while above < len(previous) and previous[above][1] + reach <= start: above += 1
+            candidate = above
+            while candidate < len(previous) and previous[candidate][0] < end + reach:
+                if previous[candidate][2] == cell:
+                    first, second = find(run), find(previous[candidate][3])
+                    if first != second: parents[max(first, second)] = min(first, second)
+                candidate += 1
+        all_runs.append(runs)
+        previous = runs
+    # Number the components by their first run (roots are always the earliest run since unions keep the smallest)
+    labels, count = {}, 0
+    flat = []
+    for runs in all_runs:
+        row = [0] * width
+        for start, end, _, run in runs:
+            root = find(run)
+            if root not in labels:
+                count += 1
+                labels[root] = count
+            row[start:end] = [labels[root]] * (end - start)
+        flat.extend(row)
+    return ArrayGrid.GridFromValues(width, height, flat), count
+
+
+def distance_transform(grid: Grid, sources: Iterable[Tuple[int, int]], wall: Any = None, connectivity: int = 4) -> ArrayGrid:
+    '''
+    This function returns a grid of ints that holds the number of steps from the nearest source to each cell (-1 if it cannot be reached)
+    The search does not enter the cells equal to "wall" (by default, None)
+    '''
+    width, height = grid.width, grid.height
+    values = flat_values(grid)
+    starts = [y * width + x for x, y in sources if 0 <= x < width and 0 <= y < height]
+    distances = breadth_first([cell != wall for cell in values], width, height, starts, connectivity)
+    return ArrayGrid.GridFromValues(width, height, distances)
@@ -1,4 +1,11 @@
-from typing import Any, Dict, List
+from array import array
+from collections import Counter
+from hashlib import blake2b
+from itertools import islice
+from operator import add
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+import math
+import os
 import utils
 
 
@@ -8,4 +15,214 @@ def histogram(values: List[Any]) -> Dict[Any, int]:
     For example, if the values are [3,5,3] then the result should be {3:2, 5:1} since 3 appears twice while 5 appears once 
     '''
     # TODO: ADD YOUR CODE HERE
-    return {v: values.count(v) for v in values}
+    return StreamingHistogram(values).to_dict()
+
+
+class StreamingHistogram:
+    # The counts are kept in a Counter so that each value is counted in O(1) by a loop that runs at C speed
+    # The values can come from any iterable (such as a generator over a huge file) since they are never stored in a list
+    __counts : Counter
+
+    def __init__(self, values: Iterable[Any] = ()) -> None:
+        self.__counts = Counter()
+        self.update(values)
+
+    # Counts the values (which can be given in as many chunks as needed)
+    def update(self, values: Iterable[Any]) -> None:
+        self.__counts.update(values)
+
+    # Adds the counts of another histogram (such as one computed by another process) to this histogram
+    def merge(self, other: 'StreamingHistogram') -> None:
+        self.__counts.update(other.__counts)
+
+    # Returns the frequency of the value (0 if it was never seen)
+    def __getitem__(self, value: Any) -> int:
+        return self.__counts[value]
+
+    # Returns the number of distinct values
+    def __len__(self) -> int:
+        return len(self.__counts)
+
+    # The number of values counted so far
+    @property
+    def total(self) -> int:
+        return sum(self.__counts.values())
+
+    # Returns the k most frequent values with their frequencies (from the most to the least frequent)
+    def most_common(self, k: Optional[int] = None) -> List[Tuple[Any, int]]:
+        return self.__counts.most_common(k)
+
+    # Returns the histogram as a dictionary that maps each value to its frequency
+    def to_dict(self) -> Dict[Any, int]:
+        return dict(self.__counts)
+
+    # This static method merges many partial histograms into one
+    @staticmethod
+    def Merge(histograms: Iterable['StreamingHistogram']) -> 'StreamingHistogram':
+        merged = StreamingHistogram()
+        for histogram in histograms: merged.merge(histogram)
+        return merged
+
+
+# The number of values that ApproximateHistogram counts exactly (with a Counter) before adding them to the sketch
+CHUNK_SIZE = 1 << 16
+
+
+class ApproximateHistogram:
+    # A count-min sketch: depth rows of width counters where each value is counted in one counter per row
+    # The frequency of a value is estimated by the smallest of its counters, which is never less than the true frequency
+    # and exceeds it by at most e*total/width with a probability of at least 1 - exp(-depth)
+    # The top-k values with the highest estimates (the heavy hitters) are tracked alongside the sketch
+    # The values are hashed by their repr with a keyed hash so that sketches built in different processes can be merged
+    __rows : List[array]
+    __top : Dict[Any, int]
+
+    def __init__(self, width: int = 2048, depth: int = 5, top_k: int = 100, seed: int = 0) -> None:
+        if width < 1 or depth < 1: raise ValueError(f"A sketch needs at least one row and one column (got width={width} and depth={depth})")
+        if top_k < 0: raise ValueError(f"top_k must not be negative (got {top_k})")
+        if not 0 <= seed < 1 << 64: raise ValueError(f"The seed is the key of the hash so it must fit in 64 unsigned bits (got {seed})")
+        self.__width = width
+        self.__depth = depth
+        self.__top_k = top_k
+        self.__seed = seed
+        self.__rows = [array('q', [0]) * width for _ in range(depth)]
+        self.__top = {}
+        self.__threshold = 0 # A lower bound on the smallest estimate among the heavy hitters
+        self.__total = 0
+
+    # Returns the index of the counter of the value in each row (the indices come from two hashes: h1 + i*h2)
+    def __indices(self, value: Any) -> List[int]:
+        digest = blake2b(repr(value).encode(), digest_size=16, key=self.__seed.to_bytes(8, 'little')).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + row * second) % self.__width for row in range(self.__depth)]
+
+    # Counts the value "count" times
+    def add(self, value: Any, count: int = 1) -> None:
+        estimate = None
+        for row, index in zip(self.__rows, self.__indices(value)):
+            row[index] += count
+            if estimate is None or row[index] < estimate: estimate = row[index]
+        self.__total += count
+        if self.__top_k: self.__offer(value, estimate) # No heavy hitters are tracked if top_k is 0
+
+    # Keeps the value among the heavy hitters if its estimate is among the top k
+    def __offer(self, value: Any, estimate: int) -> None:
+        if value in self.__top or len(self.__top) < self.__top_k:
+            self.__top[value] = estimate
+        elif estimate > self.__threshold:
+            smallest = min(self.__top, key=self.__top.get)
+            if estimate > self.__top[smallest]:
+                del self.__top[smallest]
+                self.__top[value] = estimate
+            self.__threshold = min(self.__top.values())
+
+    # Counts the values (which can be given in as many chunks as needed)
+    # Each chunk is first counted exactly so that every distinct value of the chunk is hashed only once
+    def update(self, values: Iterable[Any]) -> None:
+        iterator = iter(values)
+        while True:
+            chunk = Counter(islice(iterator, CHUNK_SIZE))
+            if not chunk: break
+            for value, count in chunk.items(): self.add(value, count)
+
+    # Adds the counters of another sketch (built with the same width, depth and seed) to this sketch
+    def merge(self, other: 'ApproximateHistogram') -> None:
+        if (self.__width, self.__depth, self.__seed) != (other.__width, other.__depth, other.__seed):
+            raise ValueError("Only sketches with the same width, depth and seed can be merged")
+        self.__rows = [array('q', map(add, row, other_row)) for row, other_row in zip(self.__rows, other.__rows)]
+        self.__total += other.__total
+        candidates = {**self.__top, **other.__top}
+        self.__top, self.__threshold = {}, 0
+        for value in candidates: self.__offer(value, self[value])
+
+    # Returns the estimated frequency of the value (0 if it was never seen, and never less than its true frequency)
+    def __getitem__(self, value: Any) -> int:
+        return min(row[index] for row, index in zip(self.__rows, self.__indices(value)))
+
+    # The number of values counted so far
+    @property
+    def total(self) -> int:
+        return self.__total
+
+    # The largest overestimate of a frequency (it holds with a probability of at least 1 - exp(-depth))
+    @property
+    def error_bound(self) -> float:
+        return math.e * self.__total / self.__width
+
+    # Returns the k heavy hitters with the highest estimated frequencies (from the most to the least frequent)
+    def most_common(self, k: Optional[int] = None) -> List[Tuple[Any, int]]:
+        return sorted(self.__top.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    # Returns the heavy hitters as a dictionary that maps each value to its estimated frequency
+    def to_dict(self) -> Dict[Any, int]:
+        return dict(self.__top)
+
+    # This static method creates a sketch whose estimates exceed the true frequencies by at most epsilon*total
+    # with a probability of at least 1 - delta
+    @staticmethod
+    def FromErrorBounds(epsilon: float, delta: float, top_k: int = 100, seed: int = 0) -> 'ApproximateHistogram':
+        if not epsilon > 0: raise ValueError(f"epsilon must be positive (got {epsilon})")
+        if not 0 < delta < 1: raise ValueError(f"delta must be between 0 and 1 (got {delta})")
+        return ApproximateHistogram(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)), top_k, seed)
+
+    # This static method merges many partial sketches into a new one (the partial sketches are not modified)
+    @staticmethod
+    def Merge(histograms: Iterable['ApproximateHistogram']) -> 'ApproximateHistogram':
+        histograms = iter(histograms)
+        first = next(histograms)
+        merged = ApproximateHistogram(first.__width, first.__depth, first.__top_k, first.__seed)
+        merged.merge(first)
+        for histogram in histograms: merged.merge(histogram)
+        return merged
+
+
+# Either kind of histogram (they have the same update, merge and query methods)
+Histogram = Union[StreamingHistogram, ApproximateHistogram]
+
+
+# Splits the file into ranges of about chunk_size bytes that start at the beginning of a line
+def line_ranges(path: str, chunk_size: int) -> List[Tuple[int, int]]:
+    size = os.path.getsize(path)
+    starts = [0]
+    with open(path, 'rb') as file:
+        while starts[-1] + chunk_size < size:
+            file.seek(starts[-1] + chunk_size)
+            file.readline() # Skip to the start of the next line
+            if file.tell() >= size: break
+            starts.append(file.tell())
+    return list(zip(starts, starts[1:] + [size]))
+
+
+# Counts the tokens in a range of the file (this is the task that runs in the worker processes)
+def count_range(task: Tuple[str, int, int, Callable[[str], Iterable[Any]], str, Callable[[], Histogram]]) -> Histogram:
+    path, start, end, tokenize, encoding, factory = task
+    with open(path, 'rb') as file:
+        file.seek(start)
+        histogram = factory()
+        histogram.update(tokenize(file.read(end - start).decode(encoding)))
+        return histogram
+
+
+# Merges the partial histograms of the chunks into the first one
+def merge_partials(partials: Iterable[Histogram]) -> Histogram:
+    partials = iter(partials)
+    merged = next(partials)
+    for partial in partials: merged.merge(partial)
+    return merged
+
+
+def histogram_file(path: str, tokenize: Callable[[str], Iterable[Any]] = str.split, workers: Optional[int] = None,
+                   chunk_size: int = 1 << 24, encoding: str = 'utf-8', factory: Callable[[], Histogram] = StreamingHistogram) -> Histogram:
+    '''
+    This function returns the histogram of the tokens in a text file (by default, the words separated by whitespace)
+    The file is split into chunks of whole lines that are counted in parallel by worker processes and then merged
+    Only one chunk per worker is in memory at a time so the file can be much larger than the memory
+    The factory creates the empty histogram of each chunk (for example, functools.partial(ApproximateHistogram, 4096, 5)
+    to count in bounded memory); it must be picklable, like the tokenize function
+    '''
+    tasks = [(path, start, end, tokenize, encoding, factory) for start, end in line_ranges(path, chunk_size)]
+    if not tasks: return factory()
+    if workers == 1 or len(tasks) <= 1: return merge_partials(map(count_range, tasks))
+    from multiprocessing import Pool # imported on first use since counting in memory does not need it
+    with Pool(workers) as pool:
+        return merge_partials(pool.imap_unordered(count_range, tasks)) # Each partial histogram is merged as soon as it is ready
@@ -1,5 +1,7 @@
-from typing import Any, Set, Tuple
+from typing import Any, Dict, Iterable, List, Set, Tuple
 from grid import Grid
+from array_grid import ArrayGrid
+from sparse_grid import SparseGrid
 import utils
 
 
@@ -10,4 +12,82 @@ def locate(grid: Grid, item: Any) -> Set[Tuple[int, int]]:
     To know how to use the Grid class, see the file "grid.py"  
     '''
     # TODO: ADD YOUR CODE HERE
+    # An indexed grid already knows the positions of each value so there is no need to scan it
+    positions = grid.indexed_positions(item)
+    if positions is not None: return positions
+    # A sparse grid only scans the cells it stores and an ArrayGrid searches its flat storage at C speed
+    if isinstance(grid, (SparseGrid, ArrayGrid)): return grid.positions(item)
     return {element for element in [(x, y) for y in range(0, grid.height) for x in range(0, grid.width)] if grid.__getitem__(element) == item}
+
+
+# Returns the flat list of the cells of the grid row by row (the cell (x, y) is at index y*width + x)
+# An ArrayGrid hands over its cells in one call so the scan does not go through __getitem__ for each cell
+def flat_values(grid: Grid) -> List[Any]:
+    if isinstance(grid, ArrayGrid): return grid.values()
+    return [grid[x, y] for y in range(grid.height) for x in range(grid.width)]
+
+
+# Returns whether the value can be used as a dictionary key
+def hashable(value: Any) -> bool:
+    try:
+        hash(value)
+        return True
+    except TypeError:
+        return False
+
+
+# Scans the stored cells of a sparse grid once and returns the positions of the cells equal to each item
+# The cells that are not stored are added to the positions of the items that are equal to the default value
+def group_sparse_positions(grid: SparseGrid, items: Iterable[Any]) -> Dict[Any, Set[Tuple[int, int]]]:
+    positions = {item: set() for item in items}
+    for position, value in grid.items():
+        item_positions = positions.get(value) if hashable(value) else None
+        if item_positions is not None: item_positions.add(position)
+    defaults = [item for item in positions if item == grid.default]
+    if defaults:
+        stored = {position for position, _ in grid.items()}
+        unstored = {(x, y) for y in range(grid.height) for x in range(grid.width) if (x, y) not in stored}
+        for item in defaults: positions[item] |= unstored
+    return positions
+
+
+# Scans the flat list of cells once and returns the positions of the cells equal to each item
+def group_positions(values: List[Any], items: Iterable[Any], width: int) -> Dict[Any, Set[Tuple[int, int]]]:
+    indices = {item: [] for item in items}
+    try:
+        found = list(map(indices.get, values)) # The lookups run at C speed unless a cell is unhashable
+    except TypeError:
+        found = [indices.get(value) if hashable(value) else None for value in values]
+    for index, item_indices in enumerate(found):
+        if item_indices is not None: item_indices.append(index)
+    return {item: {(index % width, index // width) for index in item_indices} for item, item_indices in indices.items()}
+
+
+def locate_many(grid: Grid, items: Iterable[Any]) -> Dict[Any, Set[Tuple[int, int]]]:
+    '''
+    This function takes a 2D grid and a collection of items
+    It returns a dictionary that maps each item to the set of (x, y) coordinates that contain it
+    The grid is scanned only once regardless of the number of items
+    '''
+    if grid.indexed: return {item: grid.indexed_positions(item) for item in items}
+    if isinstance(grid, SparseGrid): return group_sparse_positions(grid, items)
+    return group_positions(flat_values(grid), items, grid.width)
+
+
+def locate_all(grid: Grid) -> Dict[Any, Set[Tuple[int, int]]]:
+    '''
+    This function takes a 2D grid
+    It returns a dictionary that maps each distinct value in the grid to the set of (x, y) coordinates that contain it
+    The cells that contain unhashable values are left out since these values cannot be keys
+    '''
+    if grid.indexed: return {value: grid.indexed_positions(value) for value in grid.indexed_values()}
+    if isinstance(grid, SparseGrid):
+        distinct = dict.fromkeys(value for _, value in grid.items() if hashable(value))
+        if len(grid) < grid.width * grid.height and hashable(grid.default): distinct[grid.default] = None
+        return group_sparse_positions(grid, distinct)
+    values = flat_values(grid)
+    try:
+        distinct = dict.fromkeys(values) # Built at C speed unless a cell is unhashable
+    except TypeError:
+        distinct = dict.fromkeys(value for value in values if hashable(value))
+    return group_positions(values, distinct, grid.width)
@@ -1,3 +1,7 @@
+from array import array
+from typing import Iterable, List, Tuple
+import codecs
+import mmap
 import utils
 
 
@@ -9,3 +13,98 @@ def palindrome_check(string: str) -> bool:
     '''
     # TODO: ADD YOUR CODE HERE
     return string == string[::-1]
+
+
+def palindrome_check_many(strings: Iterable[str]) -> List[bool]:
+    '''
+    This function takes many strings and returns whether each of them is a palindrome
+    The check is inlined in a list comprehension so checking millions of short strings costs no function call per string
+    '''
+    return [string == string[::-1] for string in strings]
+
+
+# Returns whether every byte decodes on its own into exactly one character in the encoding (such as ASCII or Latin-1)
+# A multi-byte (or stateful) decoder holds back the bytes that start a character, so it returns nothing for them
+def one_byte_per_character(encoding: str) -> bool:
+    decoder = codecs.getincrementaldecoder(encoding)
+    return all(len(decoder(errors='replace').decode(bytes([byte]))) == 1 for byte in range(256))
+
+
+def palindrome_check_file(path: str, encoding: str = 'utf-8', chunk_size: int = 1 << 20) -> bool:
+    '''
+    This function returns whether the text in a file (the whole content, including any final newline) is a palindrome
+    The file is memory-mapped and chunks read from both ends are compared, so only two chunks are in memory at a time
+    The encoding must be UTF-8 or an encoding of one byte per character (such as ASCII or Latin-1)
+    '''
+    utf8 = codecs.lookup(encoding).name == 'utf-8'
+    if not utf8 and not one_byte_per_character(encoding):
+        raise ValueError(f"Only UTF-8 and the encodings of one byte per character are supported (got {encoding})")
+    with open(path, 'rb') as file:
+        size = file.seek(0, 2)
+        if size == 0: return True
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # A chunk must not split a character: in UTF-8, the bytes that continue a character start with the bits 10
+            def starts_character(position: int) -> bool:
+                return not utf8 or position == size or data[position] & 0xC0 != 0x80
+            # The unread bytes are data[low:high]; left and right are the decoded characters read from each end that are not compared yet
+            low, high = 0, size
+            left, right = '', ''
+            while True:
+                # Compare the start of the left characters with the end of the right characters
+                count = min(len(left), len(right))
+                if count:
+                    if left[:count] != right[len(right) - count:][::-1]: return False
+                    left, right = left[count:], right[:len(right) - count]
+                if low >= high: break
+                if not left:
+                    end = min(low + chunk_size, high)
+                    while not starts_character(end): end += 1
+                    left, low = data[low:end].decode(encoding), end
+                if not right and low < high:
+                    start = max(high - chunk_size, low)
+                    while not starts_character(start): start -= 1
+                    right, high = data[start:high].decode(encoding), start
+            # The characters that are left (on one side at most) are the middle of the text
+            middle = left or right
+            return middle == middle[::-1]
+
+
+class PalindromeIndex:
+    # The index holds the radii computed by Manacher's algorithm in O(n) over the string with a separator around each character
+    # (the character i is at position 2i+1 and the separators are at the even positions)
+    # The radius at position c is the length of the longest palindrome of the string centered there,
+    # so s[i:j] (which is centered at position i+j) is a palindrome if and only if its length j-i is at most that radius
+    __radii : array
+
+    def __init__(self, string: str) -> None:
+        self.__length = len(string)
+        separated = [None] * (2 * len(string) + 1) # None is never equal to a character so the separators only match each other
+        separated[1::2] = string
+        size = len(separated)
+        radii = array('q', [0]) * size
+        center, right = 0, 0 # The palindrome that reaches farthest to the right ends before "right"
+        for position in range(size):
+            radius = min(right - position, radii[2 * center - position]) if position < right else 0
+            while (position - radius - 1 >= 0 and position + radius + 1 < size
+                   and separated[position - radius - 1] == separated[position + radius + 1]):
+                radius += 1
+            radii[position] = radius
+            if position + radius > right: center, right = position, position + radius
+        self.__radii = radii
+
+    # Returns whether string[start:end] is a palindrome (the bounds follow the slicing rules, so empty slices are palindromes)
+    def is_palindrome(self, start: int, end: int) -> bool:
+        start, end, _ = slice(start, end).indices(self.__length)
+        return end <= start or self.__radii[start + end] >= end - start
+
+    # Returns whether string[start:end] is a palindrome for each (start, end) pair (the bounds must be within the string)
+    # Each query is a single lookup in the radii, done inside the comprehension rather than by calling is_palindrome
+    def is_palindrome_many(self, queries: Iterable[Tuple[int, int]]) -> List[bool]:
+        radii = self.__radii
+        return [end <= start or radii[start + end] >= end - start for start, end in queries]
+
+    # Returns the bounds (start, end) of the first longest palindromic substring (end is excluded)
+    def longest(self) -> Tuple[int, int]:
+        radii = self.__radii
+        center = max(range(len(radii)), key=radii.__getitem__)
+        return (center - radii[center]) // 2, (center + radii[center]) // 2
@@ -0,0 +1,99 @@
+from typing import Any, Dict, Iterator, List, Set, Tuple
+from grid import Grid, GridView
+
+
+class SparseGrid(Grid):
+    # Only the cells that differ from the default value are stored: the dictionary maps their positions (x, y) to their values
+    # The memory used is proportional to the number of these cells so huge mostly-empty maps can be created
+    __cells : Dict[Tuple[int, int], Any]
+
+    def __init__(self, width: int, height: int, default: Any = None) -> None:
+        self.__width = width
+        self.__height = height
+        self.__default = default
+        self.__cells = {}
+
+    # Returns True if the value is the default value (a value of another type such as False for a default of 0 is stored)
+    def __is_default(self, value: Any) -> bool:
+        return value is self.__default or (type(value) is type(self.__default) and value == self.__default)
+
+    @property
+    def width(self) -> int:
+        return self.__width
+
+    @property
+    def height(self) -> int:
+        return self.__height
+
+    # The value of the cells that are not stored
+    @property
+    def default(self) -> Any:
+        return self.__default
+
+    # The key used to access the grid is a tuple of two integers (x, y) (or slices to get a view, see Grid.__getitem__)
+    def __getitem__(self, key: Tuple[int, int]) -> Any:
+        x, y = key
+        if isinstance(x, slice) or isinstance(y, slice): return GridView(self, x, y)
+        if 0 <= x < self.__width and 0 <= y < self.__height:
+            return self.__cells.get((x, y), self.__default)
+        return None
+
+    # The key used to access the grid is a tuple of two integers (x, y)
+    def __setitem__(self, key, value) -> None:
+        x, y = key
+        if 0 <= x < self.__width and 0 <= y < self.__height:
+            old = self[x, y]
+            if self.__is_default(value):
+                self.__cells.pop((x, y), None)
+            else:
+                self.__cells[x, y] = value
+            if self.indexed: self._update_index((x, y), old, value)
+
+    def __str__(self) -> str:
+        return '\n'.join(' '.join(str(self[x, y]) for x in range(self.__width)) for y in range(self.__height))
+
+    # Returns the number of stored cells (the cells that differ from the default value)
+    def __len__(self) -> int:
+        return len(self.__cells)
+
+    # Yields the positions and values of the stored cells (in no particular order)
+    def items(self) -> Iterator[Tuple[Tuple[int, int], Any]]:
+        return iter(self.__cells.items())
+
+    # Returns the positions (x, y) of the cells equal to the value
+    # Only the stored cells are scanned unless the value is equal to the default value (then every position may be returned)
+    def positions(self, value: Any) -> Set[Tuple[int, int]]:
+        positions = {position for position, cell in self.__cells.items() if cell == value}
+        if value == self.__default:
+            positions.update((x, y) for y in range(self.__height) for x in range(self.__width) if (x, y) not in self.__cells)
+        return positions
+
+    # Returns a dense (list of lists) copy of this grid
+    def to_grid(self) -> Grid:
+        grid = Grid.GridFromArray([[self.__default] * self.__width for _ in range(self.__height)])
+        for (x, y), value in self.__cells.items(): grid[x, y] = value
+        return grid
+
+    # This static method creates a grid from a list of lists (the missing cells of the short rows are set to the default value)
+    @staticmethod
+    def GridFromArray(array: List[List[Any]], default: Any = None) -> 'SparseGrid':
+        height = len(array)
+        width = 0 if height == 0 else max(len(row) for row in array)
+        grid = SparseGrid(width, height, default)
+        for y, row in enumerate(array):
+            for x, cell in enumerate(row):
+                grid[x, y] = cell
+        return grid
+
+    # This static method creates a grid from any grid (such as a dense Grid) storing only the cells that differ from the default value
+    @staticmethod
+    def GridFromGrid(grid: Grid, default: Any = None) -> 'SparseGrid':
+        if isinstance(grid, SparseGrid) and grid.default is default:
+            sparse = SparseGrid(grid.width, grid.height, default)
+            sparse.__cells = dict(grid.__cells)
+            return sparse
+        sparse = SparseGrid(grid.width, grid.height, default)
+        for y in range(grid.height):
+            for x in range(grid.width):
+                sparse[x, y] = grid[x, y]
+        return sparse
@@ -1,26 +1,117 @@
 import traceback
 import threading
 import _thread
+import multiprocessing
+from multiprocessing.connection import wait
+from collections import deque
+import sys
 import time
+import marshal
+import tracemalloc
+import cProfile
+import pstats
+import hashlib
+import ast
+import socket
+import signal
+import subprocess
+import csv
+import re
+import math
+import statistics
 import json
 import argparse
+import xml.etree.ElementTree as ElementTree
 import os
-from typing import Any, Callable, Dict, List, Tuple, Union
+import builtins
+from types import CodeType
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
-from helpers.globals import *
+from helpers import globals as problem_globals
 from helpers.utils import *
 
 root = "testcases"
 
+# The extra time (in seconds) given to a worker process after the test time-limit before it is killed
+HARD_TIMEOUT_GRACE = 2
+
+
+# The parsed test cases of each directory are cached with the compiled code of their expressions in this file
+# Each entry is keyed by the test case file name and is only reused if the file's mtime and size did not change
+TEST_CASES_CACHE = os.path.join("__pycache__", f"testcases.{sys.implementation.cache_tag}.marshal")
+
+# Maps each expression found in the test cases to its compiled code
+compiled_expressions: Dict[str, CodeType] = {}
+# The expressions whose names were already imported into this module (see resolve_names)
+resolved_expressions: Set[str] = set()
+
+
+def compile_expression(expression: str, filename: str = "<testcase>") -> CodeType:
+    code = compiled_expressions.get(expression)
+    if code is None:
+        code = compiled_expressions[expression] = compile(expression, filename, "eval")
+    resolve_names(expression)
+    return code
+
+
+# Imports the names used by the expression from helpers.globals (which loads them on first use) into this module
+# so the modules of a problem are only imported when one of its test cases is evaluated
+def resolve_names(expression: str):
+    if expression in resolved_expressions:
+        return
+    resolved_expressions.add(expression)
+    namespace = globals()
+    for node in ast.walk(ast.parse(expression, mode="eval")):
+        if isinstance(node, ast.Name) and node.id not in namespace and not hasattr(builtins, node.id):
+            try:
+                namespace[node.id] = getattr(problem_globals, node.id)
+            except AttributeError:
+                pass  # A local name (such as a comprehension variable)
+
+
+def get_expressions(test_case: Dict[str, Any]) -> List[str]:
+    expressions = [test_case[key] for key in ("function", "comparator") if key in test_case]
+    expressions.extend(test_case.get("input_args", []))
+    expressions.extend(test_case.get("input_kwargs", {}).values())
+    expressions.extend(test_case.get("comparison_args", []))
+    expressions.extend(test_case.get("comparison_kwargs", {}).values())
+    return expressions
+
 
 def get_test_cases(path: str) -> List[Dict[str, Any]]:
+    cache_path = os.path.join(path, TEST_CASES_CACHE)
+    try:
+        with open(cache_path, 'rb') as file:
+            cache = marshal.load(file)
+    except (OSError, EOFError, ValueError, TypeError):
+        cache = {}
+    entries = {}
+    modified = False
     test_cases = []
-    for filename in os.listdir(path):
-        if filename.startswith("__"):
+    for entry in os.scandir(path):
+        if entry.name.startswith("__"):
             continue
-        filepath = os.path.join(path, filename)
-        if os.path.isfile(filepath) and os.path.splitext(filepath)[1] == ".json":
-            test_cases.append(json.load(open(filepath, 'r')))
+        if entry.is_file() and os.path.splitext(entry.name)[1] == ".json":
+            stat = entry.stat()
+            cached = cache.get(entry.name)
+            if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                compiled_expressions.update(cached[3])
+            else:
+                test_case = json.load(open(entry.path, 'r'))
+                codes = {expression: compile_expression(expression, entry.path) for expression in get_expressions(test_case)}
+                cached = (stat.st_mtime_ns, stat.st_size, test_case, codes)
+                modified = True
+            entries[entry.name] = cached
+            test_cases.append({**cached[2], "path": entry.path})
+    if modified or len(entries) != len(cache):
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temporary_path = f"{cache_path}.{os.getpid()}"
+            with open(temporary_path, 'wb') as file:
+                marshal.dump(entries, file)
+            os.replace(temporary_path, cache_path)
+        except (OSError, ValueError):
+            pass  # The cache is only an optimization so grading continues without it
     return test_cases
 
 
@@ -33,13 +124,27 @@ def timeout_function():
     _thread.interrupt_main()
 
 
-def run_test(fn: Callable, input_args: Arguments, cmp: Callable, cmp_args: Arguments, timeout: 10) -> Union[Result, None]:
+# Runs the test and fills the measurements (if given) with the wall time, the cpu time, the peak traced memory
+# (if trace_memory is true) and the number of explored nodes (if the test finished and the test tools fetched it)
+# If a profile path is given, the test runs under cProfile and its stats are written to that path
+def run_test(fn: Callable, input_args: Arguments, cmp: Callable, cmp_args: Arguments, timeout: 10,
+             measurements: Optional[Dict[str, Any]] = None, trace_memory: bool = False,
+             profile_path: Optional[str] = None, profile_top: int = 10) -> Union[Result, None]:
+    latest_fetch["calls"] = None
+    if trace_memory:
+        tracemalloc.start()
+    profiler = None if profile_path is None else cProfile.Profile()
     timer = threading.Timer(timeout, timeout_function)
     timer.start()
     start = time.time()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    finished = False
     try:
+        if profiler is not None:
+            profiler.enable()
         output = fn(*input_args.args, **input_args.kwargs)
         result = cmp(output, *cmp_args.args, **cmp_args.kwargs)
+        finished = True
     except KeyboardInterrupt as err:
         elapsed = time.time() - start
         if elapsed >= timeout:
@@ -52,9 +157,38 @@ def run_test(fn: Callable, input_args: Arguments, cmp: Callable, cmp_args: Argum
         result = Result(False, 0, traceback.format_exc())
     finally:
         timer.cancel()
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            if measurements is not None:
+                measurements["profile"] = {
+                    "path": profile_path,
+                    "hot_functions": get_hot_functions(profiler, profile_top)
+                }
+        if measurements is not None:
+            measurements["wall_time"] = time.perf_counter() - wall_start
+            measurements["cpu_time"] = time.process_time() - cpu_start
+            if trace_memory:
+                measurements["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            if finished and latest_fetch["calls"] is not None:
+                measurements["explored"] = latest_fetch["calls"]
+        if trace_memory:
+            tracemalloc.stop()
     return result
 
 
+# Returns the functions with the highest internal time (excluding the time of the functions they call) in the profile
+def get_hot_functions(profiler: cProfile.Profile, count: int) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler).stats
+    hot_functions = sorted(stats.items(), key=lambda item: -item[1][2])[:count]
+    return [{
+        "function": f"{filename}:{line}({name})",
+        "calls": calls,
+        "total_time": total_time,
+        "cumulative_time": cumulative_time
+    } for (filename, line, name), (_, calls, total_time, cumulative_time, _) in hot_functions]
+
+
 def default_comparator(output, expected):
     success = output == expected
     grade = (1 if success else 0)
@@ -75,84 +209,527 @@ def approximate_comparator(output, expected):
     return Result(success, grade, message)
 
 
+# Returns the path of the source file of a module (or package) inside the problem set directory if it exists
+def find_local_module(name: str, directory: str = "") -> Optional[str]:
+    base = os.path.join(directory, *name.split("."))
+    for path in (base + ".py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(path):
+            return os.path.normpath(path)
+    return None
+
+
+# Returns the local modules referenced by a dotted string such as 'search.minimax'
+def find_referenced_modules(text: str) -> Set[str]:
+    modules = set()
+    parts = text.split(".")
+    if all(part.isidentifier() for part in parts):
+        for end in range(1, len(parts)+1):
+            path = find_local_module(".".join(parts[:end]))
+            if path is not None:
+                modules.add(path)
+    return modules
+
+
+# Returns the local source files that the given source file needs: the modules it imports
+# and the modules it references by name (e.g. load_function("dungeon_heuristic.strong_heuristic"))
+def find_direct_dependencies(path: str) -> Set[str]:
+    dependencies = set()
+    package = os.path.dirname(path)
+    for node in ast.walk(ast.parse(open(path, 'r').read(), path)):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                dependencies |= find_referenced_modules(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            directory = package
+            for _ in range(node.level - 1):
+                directory = os.path.dirname(directory)
+            if node.level == 0:
+                directory = ""
+            module = node.module or ""
+            candidates = [module] + [f"{module}.{alias.name}" if module else alias.name for alias in node.names]
+            for candidate in candidates:
+                found = find_local_module(candidate, directory) if candidate else None
+                if found is not None:
+                    dependencies.add(found)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            dependencies |= find_referenced_modules(node.value)
+    return dependencies
+
+
+# Caches the results of the test cases so that a test is only re-executed when the test case,
+# the problem definition or any of the source files and fixtures that it depends on changes
+class ResultCache:
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.path = os.path.join(root, "__pycache__", "results.json")
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.modified = False
+        self.dependencies: Dict[str, Set[str]] = {}
+        self.digests: Dict[str, str] = {}
+        if enabled:
+            try:
+                self.entries = json.load(open(self.path, 'r'))
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get_dependencies(self, path: str) -> Set[str]:
+        if path not in self.dependencies:
+            self.dependencies[path] = found = {path}
+            pending = [path]
+            while pending:
+                for dependency in find_direct_dependencies(pending.pop()):
+                    if dependency not in found:
+                        found.add(dependency)
+                        pending.append(dependency)
+        return self.dependencies[path]
+
+    def get_digest(self, path: str) -> str:
+        if path not in self.digests:
+            self.digests[path] = hashlib.sha256(open(path, 'rb').read()).hexdigest()
+        return self.digests[path]
+
+    def get_key(self, problem: 'Problem', test_case: Dict[str, Any]) -> str:
+        files = set(self.get_dependencies(os.path.relpath(__file__)))
+        for text in get_expressions(test_case) + get_expressions(problem.definition):
+            for node in ast.walk(ast.parse(text, mode="eval")):
+                if not isinstance(node, ast.Constant) or not isinstance(node.value, str):
+                    continue
+                if os.path.isfile(node.value):
+                    files.add(os.path.normpath(node.value))  # A fixture such as a level file
+                for module in find_referenced_modules(node.value):
+                    files |= self.get_dependencies(module)
+            for module in find_referenced_modules(text):
+                files |= self.get_dependencies(module)
+        key = hashlib.sha256()
+        key.update(sys.version.encode())
+        key.update(json.dumps(problem.definition, sort_keys=True).encode())
+        key.update(json.dumps(test_case, sort_keys=True).encode())
+        for path in sorted(files):
+            key.update(path.encode())
+            key.update(self.get_digest(path).encode())
+        return key.hexdigest()
+
+    def get(self, problem: 'Problem', test_case: Dict[str, Any]) -> Optional[Tuple[Result, Dict[str, Any]]]:
+        if not self.enabled:
+            return None
+        entry = self.entries.get(test_case["path"])
+        if entry is None or entry["key"] != self.get_key(problem, test_case):
+            return None
+        return Result(entry["success"], entry["grade"], entry["message"]), entry.get("measurements", {})
+
+    def put(self, problem: 'Problem', test_case: Dict[str, Any], result: Union[Result, None], measurements: Dict[str, Any]):
+        # Unimplemented functions, timeouts and crashes depend on more than the source so they are never cached
+        if not self.enabled or result is None or result.message == "Timeout" or result.message.startswith("Worker crashed"):
+            return
+        self.entries[test_case["path"]] = {
+            "key": self.get_key(problem, test_case),
+            "success": result.success,
+            "grade": result.grade,
+            "message": result.message,
+            "measurements": measurements
+        }
+        self.modified = True
+
+    def save(self):
+        if not self.modified:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporary_path = f"{self.path}.{os.getpid()}"
+            with open(temporary_path, 'w') as file:
+                json.dump(self.entries, file, indent=4)
+            # Concurrent runs (such as the children of the daemon) never see a torn file
+            os.replace(temporary_path, self.path)
+        except (OSError, TypeError, ValueError):
+            pass
+        self.modified = False
+
+
+# Remembers the duration and the status of the latest run of each test case (keyed by its path)
+# It is used to schedule the longest test cases first and, in the fail-fast mode, the failing ones first
+class TestHistory:
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.path = os.path.join(root, "__pycache__", "history.json")
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if enabled:
+            try:
+                self.entries = json.load(open(self.path, 'r'))
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get_duration(self, path: str, default: float) -> float:
+        return self.entries.get(path, {}).get("duration", default)
+
+    def has_failed(self, path: str) -> bool:
+        return self.entries.get(path, {}).get("status", "pass") != "pass"
+
+    def update(self, problems: List['Problem']):
+        for problem in problems:
+            for record in problem.records:
+                if record["status"] == "skipped" or record["cached"]:
+                    continue
+                self.entries[record["path"]] = {
+                    "duration": record.get("wall_time", 0),
+                    "status": record["status"]
+                }
+
+    def save(self):
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporary_path = f"{self.path}.{os.getpid()}"
+            with open(temporary_path, 'w') as file:
+                json.dump(self.entries, file, indent=4)
+            # Concurrent runs (such as the children of the daemon) never see a torn file
+            os.replace(temporary_path, self.path)
+        except (OSError, TypeError, ValueError):
+            pass
+
+
 class Problem:
     def __init__(self, **kwargs) -> None:
+        self.definition = kwargs
         self.name = kwargs.get("name", "Unnamed Problem")
         self.testcases_path = kwargs.get("testcases_path", self.name)
         self.default_fn = lambda x: x
         if "function" in kwargs:
-            self.default_fn = eval(kwargs["function"])
+            self.default_fn = eval(compile_expression(kwargs["function"]))
         self.default_cmp = default_comparator
         if "comparator" in kwargs:
-            self.default_cmp = eval(kwargs["comparator"])
+            self.default_cmp = eval(compile_expression(kwargs["comparator"]))
         self.weight = kwargs.get("weight", 1)
         self.default_timeout = kwargs.get("timeout", 1)
         self.grade = 0
         self.maximum_grade = 0
+        self.records: List[Dict[str, Any]] = []
+        # The paths of the test cases assigned to this machine (None runs them all)
+        self.shard: Optional[Set[str]] = None
 
-    def run(self):
-        print(f"Problem: {self.name}")
+    def get_test_cases(self) -> List[Dict[str, Any]]:
         test_cases = get_test_cases(os.path.join(root, self.testcases_path))
+        if self.shard is not None:
+            test_cases = [test_case for test_case in test_cases if test_case["path"] in self.shard]
+        return test_cases
+
+    def get_timeout(self, test_case: Dict[str, Any]) -> float:
+        return test_case.get("timeout", self.default_timeout)
+
+    # Evaluates the test case arguments then runs the test (this is the part that runs inside the worker processes)
+    # It returns the result and the measurements of the test
+    def evaluate(self, test_case: Dict[str, Any], options: Dict[str, Any]) -> Tuple[Union[Result, None], Dict[str, Any]]:
+        fn = self.default_fn
+        if "function" in test_case:
+            fn = eval(compile_expression(test_case["function"]))
+        input_args = test_case.get("input_args", [])
+        input_kwargs = test_case.get("input_kwargs", {})
+        fn_args = Arguments(
+            [eval(compile_expression(arg)) for arg in input_args], {key: eval(compile_expression(value)) for key, value in input_kwargs.items()})
+        cmp = self.default_cmp
+        if "comparator" in test_case:
+            cmp = eval(compile_expression(test_case["comparator"]))
+        cmp_args = Arguments(
+            [eval(compile_expression(arg)) for arg in test_case.get("comparison_args", [])],
+            {key: eval(compile_expression(value)) for key, value in test_case.get("comparison_kwargs", {}).items()})
+        measurements = {}
+        profile_path = None
+        if options.get("profile_dir") is not None:
+            # The profile of testcases/q1/test.json is written to <profile_dir>/q1/test.pstats
+            name = os.path.splitext(os.path.relpath(test_case["path"], root))[0]
+            profile_path = os.path.join(options["profile_dir"], name + ".pstats")
+            os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+        result = run_test(fn, fn_args, cmp, cmp_args, self.get_timeout(test_case), measurements, options.get("trace_memory", False),
+                          profile_path, options.get("profile_top", 10))
+        return result, measurements
+
+    def begin(self):
+        print(f"Problem: {self.name}")
         self.grade = 0
         self.maximum_grade = 0
-        for test_index, test_case in enumerate(test_cases):
-            description = test_case.get(
-                "description", f"Test Case {test_index+1}")
-            timeout = test_case.get("timeout", self.default_timeout)
-            print(f"{test_index+1}: {description} :: time-limit = {timeout}sec")
-            fn = self.default_fn
-            if "function" in test_case:
-                fn = eval(test_case["function"])
+        self.records = []
+
+    def describe(self, test_index: int, test_case: Dict[str, Any]):
+        description = test_case.get(
+            "description", f"Test Case {test_index+1}")
+        print(f"{test_index+1}: {description} :: time-limit = {self.get_timeout(test_case)}sec")
+
+    def record(self, test_case: Dict[str, Any], result: Union[Result, None], measurements: Dict[str, Any], cached: bool = False):
+        weight = test_case.get("weight", 1)
+        maximum_grade = self.weight * weight * \
+            test_case.get("maximum_grade", 1)
+        self.maximum_grade += maximum_grade
+        grade = 0 if result is None else self.weight * weight * result.grade
+        self.records.append({
+            "description": test_case.get("description", f"Test Case {len(self.records)+1}"),
+            "path": test_case["path"],
+            "status": "not-implemented" if result is None else ("pass" if result.success else "fail"),
+            "grade": grade,
+            "maximum_grade": maximum_grade,
+            "message": "" if result is None else result.message,
+            "cached": cached,
+            **measurements
+        })
+        if result is None:
+            print("Function is not implemented yet")
+            return
+        source = " (cached)" if cached else ""
+        if result.success:
+            print(f"Result: PASS {grade}/{maximum_grade}{source}", end="")
+            if result.message:
+                print(" -", result.message)
+            else:
+                print()
+        else:
+            print(
+                f"Result: FAIL {grade}/{maximum_grade}{source} - {result.message}")
             input_args = test_case.get("input_args", [])
             input_kwargs = test_case.get("input_kwargs", {})
-            fn_args = Arguments(
-                [eval(arg) for arg in input_args], {key: eval(value) for key, value in input_kwargs.items()})
-            cmp = self.default_cmp
-            if "comparator" in test_case:
-                cmp = eval(test_case["comparator"])
-            cmp_args = Arguments(
-                [eval(arg) for arg in test_case.get("comparison_args", [])],
-                {key: eval(value) for key, value in test_case.get("comparison_kwargs", {}).items()})
-            weight = test_case.get("weight", 1)
-            maximum_grade = self.weight * weight * \
-                test_case.get("maximum_grade", 1)
-            self.maximum_grade += maximum_grade
-            result = run_test(fn, fn_args, cmp, cmp_args, timeout)
-            if result is None:
-                print("Function is not implemented yet")
+            if input_args:
+                print("Input positional arguments:")
+                for arg in input_args:
+                    print(f"- {arg}")
+            if input_kwargs:
+                print(f"Input keyword arguments:")
+                for key, val in input_kwargs.items():
+                    print(f"- {key}: {val}")
+            print()
+        self.grade += grade
+
+    # Records a test case that was not run since the fail-fast mode stopped at an earlier failure
+    def skip(self, test_case: Dict[str, Any]):
+        weight = test_case.get("weight", 1)
+        maximum_grade = self.weight * weight * \
+            test_case.get("maximum_grade", 1)
+        self.maximum_grade += maximum_grade
+        self.records.append({
+            "description": test_case.get("description", f"Test Case {len(self.records)+1}"),
+            "path": test_case["path"],
+            "status": "skipped",
+            "grade": 0,
+            "maximum_grade": maximum_grade,
+            "message": "Skipped after a failure (fail-fast)",
+            "cached": False
+        })
+        print(f"Result: SKIPPED 0/{maximum_grade} - not run since an earlier test failed")
+
+    def end(self):
+        print(f"Total {self.grade}/{self.maximum_grade}")
+
+    def run(self, cache: ResultCache, options: Dict[str, Any]):
+        self.begin()
+        for test_index, test_case in enumerate(self.get_test_cases()):
+            self.describe(test_index, test_case)
+            cached = cache.get(self, test_case)
+            if cached is not None:
+                self.record(test_case, *cached, True)
                 continue
-            grade = self.weight * weight * result.grade
-            if result.success:
-                print(f"Result: PASS {grade}/{maximum_grade}", end="")
-                if result.message:
-                    print(" -", result.message)
-                else:
-                    print()
+            result, measurements = self.evaluate(test_case, options)
+            cache.put(self, test_case, result, measurements)
+            self.record(test_case, result, measurements)
+        self.end()
+
+
+# The loop run by each worker process: it receives (key, problem definition, test case, options) tasks
+# and sends back (key, (result, measurements))
+def worker_loop(connection):
+    problems: Dict[str, Problem] = {}
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        key, definition, test_case, options = task
+        problem_key = json.dumps(definition, sort_keys=True)
+        if problem_key not in problems:
+            problems[problem_key] = Problem(**definition)
+        try:
+            outcome = problems[problem_key].evaluate(test_case, options)
+        except:
+            outcome = Result(False, 0, traceback.format_exc()), {}
+        connection.send((key, outcome))
+
+
+class Worker:
+    def __init__(self, context) -> None:
+        sys.stdout.flush()  # Otherwise, the forked process would flush a copy of the parent's pending output
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=worker_loop, args=(child_connection,), daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.key = None
+        self.started = None
+        self.deadline = None
+
+    @property
+    def busy(self) -> bool:
+        return self.key is not None
+
+    def submit(self, key: Any, problem: Problem, test_case: Dict[str, Any], options: Dict[str, Any]):
+        self.key = key
+        self.started = time.time()
+        self.deadline = self.started + problem.get_timeout(test_case) + HARD_TIMEOUT_GRACE
+        self.connection.send((key, problem.definition, test_case, options))
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def close(self):
+        try:
+            self.connection.send(None)
+        except:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+        self.connection.close()
+
+
+# Runs the tasks (key, problem, test case) in a pool of worker processes and yields (key, (result, measurements)) as soon as each test finishes
+# A worker that exceeds the hard time-limit or crashes is killed and replaced by a fresh one
+def run_in_parallel(tasks: List[Tuple[Any, Problem, Dict[str, Any]]], jobs: int, options: Dict[str, Any]):
+    context = multiprocessing.get_context()
+    pending = deque(tasks)
+    workers = [Worker(context) for _ in range(min(jobs, len(tasks)))]
+    try:
+        while True:
+            for worker in workers:
+                if not worker.busy and pending:
+                    worker.submit(*pending.popleft(), options)
+            busy = [worker for worker in workers if worker.busy]
+            if not busy:
+                break
+            timeout = max(0, min(worker.deadline for worker in busy) - time.time())
+            ready = wait([worker.connection for worker in busy], timeout)
+            for index, worker in enumerate(workers):
+                if not worker.busy:
+                    continue
+                if worker.connection in ready:
+                    try:
+                        key, outcome = worker.connection.recv()
+                        worker.key = None
+                    except EOFError:
+                        worker.kill()
+                        result = Result(False, 0, f"Worker crashed with exit code {worker.process.exitcode}")
+                        key, outcome = worker.key, (result, {"wall_time": time.time() - worker.started})
+                        workers[index] = Worker(context)
+                    yield key, outcome
+                elif worker.deadline <= time.time():
+                    key, outcome = worker.key, (Result(False, 0, "Timeout"), {"wall_time": time.time() - worker.started})
+                    worker.kill()
+                    workers[index] = Worker(context)
+                    yield key, outcome
+    finally:
+        for worker in workers:
+            worker.close()
+
+
+# Runs the tasks one after the other in this process (in the given order) and yields (key, (result, measurements)) as they finish
+def run_in_order(tasks: List[Tuple[Any, Problem, Dict[str, Any]]], options: Dict[str, Any]):
+    for key, problem, test_case in tasks:
+        yield key, problem.evaluate(test_case, options)
+
+
+# Runs the test cases of all the problems concurrently but prints the results in the same order as a sequential run
+# The longest test cases (according to the history) are started first so that they do not end up running alone at the end
+# In the fail-fast mode, the test cases that failed in their latest run are started first and the grading stops at the first failure
+# With isolate, the tests run in worker processes (that are killed on a hard timeout) even if there is a single job
+def run_problems_in_parallel(problems: List[Problem], jobs: int, cache: ResultCache, history: TestHistory,
+                             options: Dict[str, Any], fail_fast: bool = False, isolate: bool = False):
+    test_cases = [problem.get_test_cases() for problem in problems]
+    tasks = []
+    cached = {}
+    for problem_index, problem in enumerate(problems):
+        for test_index, test_case in enumerate(test_cases[problem_index]):
+            outcome = cache.get(problem, test_case)
+            if outcome is not None:
+                cached[(problem_index, test_index)] = outcome
             else:
-                print(
-                    f"Result: FAIL {grade}/{maximum_grade} - {result.message}")
-                if input_args:
-                    print("Input positional arguments:")
-                    for arg in input_args:
-                        print(f"- {arg}")
-                if input_kwargs:
-                    print(f"Input keyword arguments:")
-                    for key, val in input_kwargs.items():
-                        print(f"- {key}: {val}")
-                print()
-            self.grade += grade
-        print(f"Total {self.grade}/{self.maximum_grade}")
+                tasks.append(((problem_index, test_index), problem, test_case))
+    if jobs > 1:
+        tasks.sort(key=lambda task: -history.get_duration(task[2]["path"], task[1].get_timeout(task[2])))
+    if fail_fast:
+        # The sort is stable so the previous order is kept otherwise
+        tasks.sort(key=lambda task: not history.has_failed(task[2]["path"]))
+    outcomes = dict(cached)
+    if jobs > 1 or isolate:
+        finished = run_in_parallel(tasks, jobs, options)
+    else:
+        finished = run_in_order(tasks, options)
+    stopped = fail_fast and any(result is None or not result.success for result, _ in cached.values())
+    for problem_index, problem in enumerate(problems):
+        problem.begin()
+        for test_index, test_case in enumerate(test_cases[problem_index]):
+            while (problem_index, test_index) not in outcomes and not stopped:
+                key, outcome = next(finished)
+                outcomes[key] = outcome
+                cache.put(problems[key[0]], test_cases[key[0]][key[1]], *outcome)
+                if fail_fast and (outcome[0] is None or not outcome[0].success):
+                    stopped = True
+                    finished.close()  # Stops the workers
+            problem.describe(test_index, test_case)
+            if (problem_index, test_index) in outcomes:
+                problem.record(test_case, *outcomes.pop((problem_index, test_index)), (problem_index, test_index) in cached)
+            else:
+                problem.skip(test_case)
+        problem.end()
+        print()
 
 
-def main(args: argparse.Namespace):
-    name, problems = read_problems()
-    problems = [Problem(**problem) for problem in problems]
-    print(f"\n{name}\n")
-    total_grade = 0
-    maximum_grade = 0
-    if args.question != "all":
+def write_json_report(path: str, name: str, problems: List[Problem], shard: Optional[Tuple[int, int]] = None):
+    report = {
+        "name": name,
+        "shard": None if shard is None else f"{shard[0]}/{shard[1]}",
+        "grade": sum(problem.grade for problem in problems),
+        "maximum_grade": sum(problem.maximum_grade for problem in problems),
+        "problems": [{
+            "name": problem.name,
+            "grade": problem.grade,
+            "maximum_grade": problem.maximum_grade,
+            "tests": problem.records
+        } for problem in problems]
+    }
+    json.dump(report, open(path, 'w'), indent=4)
+
+
+# Writes a JUnit XML report where each problem is a test suite and the measurements are stored as test case properties
+def write_junit_report(path: str, name: str, problems: List[Problem]):
+    suites = ElementTree.Element("testsuites", name=name)
+    for problem in problems:
+        records = problem.records
+        suite = ElementTree.SubElement(suites, "testsuite",
+            name=problem.name,
+            tests=str(len(records)),
+            failures=str(sum(record["status"] == "fail" for record in records)),
+            skipped=str(sum(record["status"] in ("not-implemented", "skipped") for record in records)),
+            time=f'{sum(record.get("wall_time", 0) for record in records):.6f}')
+        for record in records:
+            case = ElementTree.SubElement(suite, "testcase", classname=problem.name, name=record["description"], file=record["path"], time=f'{record.get("wall_time", 0):.6f}')
+            properties = ElementTree.SubElement(case, "properties")
+            for key in ("grade", "maximum_grade", "cached", "cpu_time", "peak_memory", "explored"):
+                if key in record:
+                    ElementTree.SubElement(properties, "property", name=key, value=str(record[key]))
+            if "profile" in record:
+                ElementTree.SubElement(properties, "property", name="profile", value=record["profile"]["path"])
+            if record["status"] == "fail":
+                ElementTree.SubElement(case, "failure", message=record["message"].split("\n")[0]).text = record["message"]
+            elif record["status"] == "not-implemented":
+                ElementTree.SubElement(case, "skipped", message="Function is not implemented yet")
+            elif record["status"] == "skipped":
+                ElementTree.SubElement(case, "skipped", message=record["message"])
+    tree = ElementTree.ElementTree(suites)
+    ElementTree.indent(tree)
+    tree.write(path, encoding="utf-8", xml_declaration=True)
+
+
+def select_problems(problems: List[Dict[str, Any]], question: str) -> List[Dict[str, Any]]:
+    if question != "all":
         try:
-            questions: str = args.question
+            questions: str = question
             exclude = False
             if questions.startswith("~"):
                 questions = questions[1:]
@@ -166,12 +743,417 @@ def main(args: argparse.Namespace):
                     problems) if index in selected]
         except:
             pass
+    return problems
+
+
+# Returns the p-th percentile of the values (using the nearest-rank method)
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+# Runs each test case once as a warm-up then repeatedly to report the min/median/p95 of its run time
+# The timings are compared with the baseline file (if it exists) and a test is flagged when its median regresses beyond the threshold
+def run_benchmarks(problems: List[Problem], args: argparse.Namespace) -> bool:
+    try:
+        baseline = json.load(open(args.baseline, 'r'))
+    except (OSError, ValueError):
+        baseline = {}
+    options = {"trace_memory": False}
+    timings = {}
+    regressions = 0
+    for problem in problems:
+        print(f"Problem: {problem.name}")
+        for test_index, test_case in enumerate(problem.get_test_cases()):
+            description = test_case.get(
+                "description", f"Test Case {test_index+1}")
+            problem.evaluate(test_case, options)  # Warm-up
+            times = []
+            failures = 0
+            for _ in range(args.repeat):
+                result, measurements = problem.evaluate(test_case, options)
+                times.append(measurements["wall_time"])
+                if result is None or not result.success:
+                    failures += 1
+            timing = {"min": min(times), "median": statistics.median(times),
+                      "p95": percentile(times, 95), "repeat": args.repeat}
+            timings[test_case["path"]] = timing
+            line = (f"{test_index+1}: {description} :: min = {timing['min']*1000:.3f}ms, "
+                    f"median = {timing['median']*1000:.3f}ms, p95 = {timing['p95']*1000:.3f}ms")
+            if failures:
+                line += f" ({failures}/{args.repeat} runs did not pass)"
+            reference = baseline.get(test_case["path"])
+            if reference is not None:
+                change = 0
+                if reference["median"] > 0:
+                    change = (timing["median"] - reference["median"]) / reference["median"] * 100
+                line += f" [{change:+.1f}% vs baseline]"
+                if change > args.regression_threshold:
+                    line += " REGRESSION"
+                    regressions += 1
+            print(line)
+        print()
+    if not baseline or args.update_baseline:
+        baseline.update(timings)
+        json.dump(baseline, open(args.baseline, 'w'), indent=4)
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"{regressions} test(s) regressed by more than "
+              f"{args.regression_threshold}% compared to the baseline")
+    return regressions == 0
+
+
+# Parses an argument that must be a positive int (such as the number of timed runs of --repeat)
+def positive_int(text: str) -> int:
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value '{text}'")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"invalid value '{text}' (expected at least 1)")
+    return value
+
+
+# Parses the "i/N" shard argument (where 1 <= i <= N)
+def parse_shard(text: str) -> Tuple[int, int]:
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{text}' (expected i/N)")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"invalid shard '{text}' (expected 1 <= i <= N)")
+    return index, count
+
+
+# Reads the duration of each test case from a json report (such as the merged report of a previous sharded run) or a test history file
+def load_durations(path: Optional[str]) -> Dict[str, float]:
+    if path is None:
+        return {}
+    try:
+        report = json.load(open(path, 'r'))
+    except (OSError, ValueError):
+        print(f"Could not read the durations from {path} so the shards are balanced by the time-limits")
+        return {}
+    if "problems" not in report:
+        return {path: entry["duration"] for path, entry in report.items()}
+    return {record["path"]: record["wall_time"]
+            for problem in report["problems"]
+            for record in problem["tests"] if "wall_time" in record}
+
+
+# Splits the test cases of the problems into N shards and assigns each problem the paths of its test cases in the given shard
+# The longest test cases are assigned first, each to the shard with the least total duration, so every machine computes the same split
+# The durations come from a previous run when available otherwise the time-limits are used as an estimate
+def apply_shard(problems: List[Problem], shard: Tuple[int, int], durations: Dict[str, float]):
+    index, count = shard
+    fallback = statistics.mean(durations.values()) if durations else None
+    tests = []
+    for problem in problems:
+        for test_case in problem.get_test_cases():
+            estimate = fallback
+            if fallback is None:
+                estimate = test_case.get("timeout", problem.default_timeout)
+            tests.append((durations.get(test_case["path"], estimate), test_case["path"]))
+    loads = [0.0] * count
+    assigned = [set() for _ in range(count)]
+    for duration, path in sorted(tests, key=lambda test: (-test[0], test[1])):
+        target = min(range(count), key=lambda shard_index: (loads[shard_index], shard_index))
+        loads[target] += duration
+        assigned[target].add(path)
+    for problem in problems:
+        problem.shard = assigned[index-1]
+    print(f"Shard {index}/{count}: {len(assigned[index-1])} of {len(tests)} test cases")
+
+
+# Combines the json reports written by the shards into the report (and total) of an unsharded run
+def merge_reports(args: argparse.Namespace):
+    name, problems = read_problems()
+    reports = [json.load(open(path, 'r')) for path in args.merge]
+    records = {}
+    included = set()
+    for report in reports:
+        for problem_report in report["problems"]:
+            included.add(problem_report["name"])
+            for record in problem_report["tests"]:
+                if record["path"] in records:
+                    print(f"Warning: {record['path']} appears in more than one shard")
+                records[record["path"]] = record
+    print(f"\n{name}\n")
+    complete = True
+    total_grade = 0
+    maximum_grade = 0
+    problems = [Problem(**problem) for problem in problems if problem.get("name", "Unnamed Problem") in included]
     for problem in problems:
-        problem.run()
+        problem.begin()
+        for test_case in problem.get_test_cases():
+            record = records.pop(test_case["path"], None)
+            if record is None:
+                print(f"Warning: {test_case['path']} is missing from the shard reports")
+                complete = False
+                continue
+            problem.records.append(record)
+            problem.grade += record["grade"]
+            problem.maximum_grade += record["maximum_grade"]
+        problem.end()
         print()
         total_grade += problem.grade
         maximum_grade += problem.maximum_grade
+    for path in records:
+        print(f"Warning: {path} is not a test case of this problem set")
+    if args.report == "junit":
+        write_junit_report(args.report_path or "report.xml", name, problems)
+    else:
+        write_json_report(args.report_path or "report.json", name, problems)
     print(f"Problem Set Total {total_grade}/{maximum_grade}\n")
+    if not complete:
+        sys.exit(1)
+
+
+def main(args: argparse.Namespace):
+    name, problems = read_problems()
+    print(f"\n{name}\n")
+    total_grade = 0
+    maximum_grade = 0
+    # Only the selected problems are created so the modules of the other problems are never imported
+    problems = [Problem(**problem) for problem in select_problems(problems, args.question)]
+    if args.shard:
+        apply_shard(problems, args.shard, load_durations(args.shard_durations))
+        if args.report is None:
+            args.report = "json"  # The shard reports are combined later by --merge
+    if args.bench:
+        if not run_benchmarks(problems, args):
+            sys.exit(1)
+        return
+    if args.profile and args.report is None:
+        args.report = "json"  # The report holds the hot functions of each test case
+    # Every test case has to run to be profiled or to have its memory traced
+    cache = ResultCache(not args.no_cache and not args.profile and not args.trace_memory)
+    history = TestHistory(not args.no_history)
+    options = {
+        "trace_memory": args.trace_memory,
+        "profile_dir": args.profile,
+        "profile_top": args.profile_top
+    }
+    jobs = 1 if args.jobs is None else args.jobs
+    if jobs != 1 or args.fail_fast or args.isolate:
+        jobs = jobs if jobs > 0 else os.cpu_count()
+        run_problems_in_parallel(problems, jobs, cache, history, options, args.fail_fast, args.isolate)
+    else:
+        for problem in problems:
+            problem.run(cache, options)
+            print()
+    cache.save()
+    history.update(problems)
+    history.save()
+    report_name = "report"
+    if args.shard is not None:
+        report_name = f"report.shard{args.shard[0]}of{args.shard[1]}"
+    if args.report == "json":
+        write_json_report(args.report_path or f"{report_name}.json", name, problems, args.shard)
+    elif args.report == "junit":
+        write_junit_report(args.report_path or f"{report_name}.xml", name, problems)
+    for problem in problems:
+        total_grade += problem.grade
+        maximum_grade += problem.maximum_grade
+    print(f"Problem Set Total {total_grade}/{maximum_grade}\n")
+    if args.profile:
+        print(f"The profiles of the test cases were written to {args.profile} (open them with python -m pstats)\n")
+
+
+# Runs the autograder in a fresh interpreter where the submission directory comes first in the module search path
+# so its modules replace the ones in the problem set directory (while the test cases and fixtures are shared)
+BATCH_BOOTSTRAP = "import sys, runpy; sys.path.insert(0, sys.argv[1]); sys.argv = sys.argv[2:]; runpy.run_path(sys.argv[0], run_name='__main__')"
+
+
+# Grades every submission (each subdirectory of the given directory) in a separate process, several at a time
+# Each submission's output and report are written to the output directory along with the gradebook of all the submissions
+def grade_submissions(args: argparse.Namespace):
+    _, problems = read_problems()
+    problems = [Problem(**problem) for problem in select_problems(problems, args.question)]
+    # Each test of a submission is killed on its own hard timeout (see --isolate) so a hung test only fails itself
+    # The submission as a whole is only killed if it takes twice the time-limits of all its tests (and the grace periods) combined,
+    # which leaves room for restarting the workers of the killed tests
+    time_limit = 2 * sum(problem.get_timeout(test_case) + HARD_TIMEOUT_GRACE
+                         for problem in problems for test_case in problem.get_test_cases())
+    submissions = sorted(entry.name for entry in os.scandir(args.batch) if entry.is_dir() and not entry.name.startswith((".", "__")))
+    os.makedirs(args.batch_output, exist_ok=True)
+    jobs = args.jobs if args.jobs else os.cpu_count()  # All the cores unless --jobs is given
+    pending = deque(submissions)
+    running = {}
+    statuses = {}
+    print(f"Grading {len(submissions)} submissions using {jobs} processes")
+    while pending or running:
+        while pending and len(running) < jobs:
+            submission = pending.popleft()
+            log = open(os.path.join(args.batch_output, f"{submission}.log"), 'w')
+            command = [
+                sys.executable, "-c", BATCH_BOOTSTRAP, os.path.abspath(os.path.join(args.batch, submission)), os.path.abspath(__file__),
+                "--question", args.question, "--no-cache", "--no-history", "--jobs", "1", "--isolate", "--report", "json", "--report-path", os.path.join(args.batch_output, f"{submission}.json")
+            ]
+            process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+            running[submission] = (process, log, time.time() + time_limit)
+        for submission, (process, log, deadline) in list(running.items()):
+            if process.poll() is None:
+                if time.time() < deadline:
+                    continue
+                process.kill()
+                process.wait()
+                statuses[submission] = "timeout"
+            else:
+                statuses[submission] = "ok" if process.returncode == 0 else f"crashed (exit code {process.returncode})"
+            log.close()
+            del running[submission]
+            print(f"{submission}: {statuses[submission]}")
+        time.sleep(0.05)
+    write_gradebook(args.batch_output, problems, submissions, statuses)
+
+
+# Writes the gradebook (as both CSV and JSON) from the reports of the submissions
+def write_gradebook(directory: str, problems: List[Problem], submissions: List[str], statuses: Dict[str, str]):
+    gradebook = []
+    for submission in submissions:
+        entry = {"submission": submission, "status": statuses[submission], "grade": None, "maximum_grade": None, "problems": {}}
+        report_path = os.path.join(directory, f"{submission}.json")
+        if statuses[submission] == "ok" and os.path.isfile(report_path):
+            report = json.load(open(report_path, 'r'))
+            entry["grade"], entry["maximum_grade"] = report["grade"], report["maximum_grade"]
+            entry["problems"] = {problem["name"]: problem["grade"] for problem in report["problems"]}
+        gradebook.append(entry)
+    json.dump(gradebook, open(os.path.join(directory, "gradebook.json"), 'w'), indent=4)
+    with open(os.path.join(directory, "gradebook.csv"), 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["submission", "status", *(problem.name for problem in problems), "grade", "maximum_grade"])
+        for entry in gradebook:
+            writer.writerow([entry["submission"], entry["status"], *(entry["problems"].get(problem.name, "") for problem in problems), entry["grade"], entry["maximum_grade"]])
+    print(f"Gradebook written to {os.path.join(directory, 'gradebook.csv')}")
+
+
+# Returns the modification times of the source files (inside the problem set directory) of the loaded modules
+def get_loaded_sources() -> Dict[str, int]:
+    directory = os.path.join(os.getcwd(), "")
+    sources = {}
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if path and os.path.abspath(path).startswith(directory) and os.path.isfile(path):
+            sources[path] = os.stat(path).st_mtime_ns
+    return sources
+
+
+# The last line that a child of the daemon sends to the client: this prefix followed by the exit status of the request
+# (it starts with a null byte so that it cannot be mistaken for the output of the grading)
+EXIT_STATUS_PREFIX = "\0exit "
+
+
+# Runs inside the forked child: reads the request (the autograder arguments as a json line) and grades with the output sent to the client
+def handle_request(connection: socket.socket, parser: argparse.ArgumentParser, sources: Dict[str, int]):
+    status = 1  # The exit status of the request (it stays 1 if the request crashed)
+    try:
+        request = json.loads(connection.makefile('r').readline() or "{}")
+        argv = request.get("argv", [])
+        os.dup2(connection.fileno(), 1)
+        os.dup2(connection.fileno(), 2)
+        sys.stdout.reconfigure(line_buffering=True)
+        if any(not os.path.isfile(path) or os.stat(path).st_mtime_ns != mtime for path, mtime in sources.items()):
+            # Some preloaded modules were edited after the daemon started so we fall back to a fresh interpreter
+            status = subprocess.run([sys.executable, sys.argv[0], *argv]).returncode
+        else:
+            args = parser.parse_args(argv)
+            args.serve = None
+            main(args)
+            status = 0
+    except SystemExit as exit:
+        if isinstance(exit.code, str): print(exit.code, file=sys.stderr)  # Like the interpreter, a message means the status 1
+        status = exit.code if isinstance(exit.code, int) else int(exit.code is not None)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        connection.sendall(f"{EXIT_STATUS_PREFIX}{status}\n".encode())
+        os._exit(0)
+
+
+# Imports everything the test cases use so that the children forked by the daemon
+# inherit the loaded modules: the lazy names of the globals, the dependencies that
+# the problem modules import on first use and the names used by every test case
+def preload_problem_set():
+    for module_name in (problem_globals.LAZY_MODULES
+                        + problem_globals.PRELOAD_MODULES):
+        try:
+            importlib.import_module(module_name)
+        except ImportError as error:
+            print(f"Could not preload {module_name}: {error}")
+    for name in problem_globals.LAZY_NAMES:
+        try:
+            getattr(problem_globals, name)
+        except Exception as error:
+            print(f"Could not preload {name}: {error}")
+    _, definitions = read_problems()
+    for definition in definitions:
+        try:
+            problem = Problem(**definition)
+            for test_case in problem.get_test_cases():
+                for expression in get_expressions(test_case):
+                    compile_expression(expression)
+        # A broken submission is reported by the requests that grade it
+        except Exception as error:
+            name = definition.get('name', 'Unnamed Problem')
+            print(f"Could not preload {name}: {error}")
+
+
+# Keeps the problem set preloaded and forks a fresh child for each grading request received on the unix socket
+def serve(socket_path: str, parser: argparse.ArgumentParser):
+    if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+        print("The autograder daemon requires a system that supports fork and unix sockets")
+        return
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # The finished children are reaped automatically
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # Stop gracefully on SIGTERM as if Ctrl+C was pressed
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+    preload_problem_set()
+    # After preloading so that edits to any loaded module are detected
+    sources = get_loaded_sources()
+    print(f"Serving grading requests on {socket_path} (Press Ctrl+C to stop)")
+    try:
+        while True:
+            connection, _ = server.accept()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            if os.fork() == 0:
+                server.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                handle_request(connection, parser, sources)
+            connection.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        os.unlink(socket_path)
+
+
+# Re-runs the autograder with the given arguments under "python -X importtime" then prints the slowest imports
+# Each module is listed with its cumulative import time (including the modules it imports) and its own (self) import time
+def report_import_time(argv: List[str], count: int = 20):
+    command = [sys.executable, "-X", "importtime", sys.argv[0], *argv]
+    process = subprocess.run(command, stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in process.stderr.splitlines():
+        match = re.match(r"import time:\s*(\d+) \|\s*(\d+) \| (\s*)(.+)", line)
+        if match is None:
+            if not line.startswith("import time:"):
+                print(line, file=sys.stderr)  # Not an import time line (such as a traceback)
+            continue
+        imports.append((int(match[2]), int(match[1]), match[3] + match[4]))
+    total = sum(self_time for _, self_time, _ in imports)
+    print(f"Imported {len(imports)} modules in {total/1000:.1f}ms, the slowest {min(count, len(imports))} are:")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative, self_time, module in sorted(imports, key=lambda entry: -entry[0])[:count]:
+        print(f"{cumulative/1000:10.1f}ms {self_time/1000:8.1f}ms  {module}")
+    sys.exit(process.returncode)
 
 
 if __name__ == "__main__":
@@ -179,5 +1161,60 @@ if __name__ == "__main__":
         description="Automatically grades the solutions for the problem set")
     parser.add_argument("--question", "-q", default="all",
                         help="choose the question(s) to include in the grading (or prefix with ~ to exclude)")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="the number of worker processes used to run the test cases concurrently (0 uses all the cores), "
+                             "or the number of submissions graded at once in batch mode (all the cores by default)")
+    parser.add_argument("--isolate", action="store_true",
+                        help="run each test case in a worker process that is killed on a hard timeout even with a single job "
+                             "(used by the batch mode so that a hung test only fails itself)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="re-execute every test case instead of reusing the cached results of the unchanged ones")
+    parser.add_argument("--no-history", action="store_true",
+                        help="do not read or update the history of the test durations and statuses (used to schedule the tests)")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="run the tests that failed last time first and stop grading at the first failure (the remaining tests are skipped)")
+    parser.add_argument("--report", choices=["json", "junit"],
+                        help="write a structured report with the result, timing, peak memory and explored nodes of each test case")
+    parser.add_argument("--report-path",
+                        help="the path of the report (defaults to report.json or report.xml)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="measure the peak memory of each test case with tracemalloc (this slows the tests down so they may exceed their time-limit)")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="run each test case under cProfile, write its stats to DIR and list its hot functions in the report (this slows the tests down so they may exceed their time-limit)")
+    parser.add_argument("--profile-top", type=int, default=10,
+                        help="the number of hot functions listed in the report for each profiled test case")
+    parser.add_argument("--bench", action="store_true",
+                        help="benchmark the test cases instead of grading them (each test runs once as a warm-up then --repeat times)")
+    parser.add_argument("--repeat", type=positive_int, default=10,
+                        help="the number of timed runs per test case in the benchmark mode")
+    parser.add_argument("--baseline", default="benchmark.json",
+                        help="the baseline file that the benchmark results are compared with (it is created if it does not exist)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="overwrite the baseline with the results of this benchmark")
+    parser.add_argument("--regression-threshold", type=float, default=10,
+                        help="the percentage by which a test's median time may exceed the baseline before it is flagged as a regression")
+    parser.add_argument("--shard", type=parse_shard, metavar="i/N",
+                        help="run only the i-th of N balanced slices of the test cases (so N machines can share the grading) and write its json report")
+    parser.add_argument("--shard-durations", metavar="REPORT",
+                        help="a json report of a previous run (such as a merged report) or a test history file whose test durations are used to balance the shards")
+    parser.add_argument("--merge", nargs="+", metavar="REPORT",
+                        help="combine the json reports of the shards into one report (written to --report-path) and print the total")
+    parser.add_argument("--batch", metavar="DIRECTORY",
+                        help="grade every submission (subdirectory) in the given directory, each in its own process (--jobs sets how many run at once, all the cores by default)")
+    parser.add_argument("--batch-output", default="batch",
+                        help="the directory where the batch mode writes the outputs, the reports and the gradebook")
+    parser.add_argument("--import-time", action="store_true",
+                        help="run the autograder under \"python -X importtime\" and report the modules that took the longest to import")
+    parser.add_argument("--serve", metavar="SOCKET",
+                        help="preload the problem set and serve the grading requests sent by autograder_client.py on the given unix socket")
     args = parser.parse_args()
-    main(args)
+    if args.import_time:
+        report_import_time([arg for arg in sys.argv[1:] if arg != "--import-time"])
+    elif args.serve:
+        serve(args.serve, parser)
+    elif args.batch:
+        grade_submissions(args)
+    elif args.merge:
+        merge_reports(args)
+    else:
+        main(args)
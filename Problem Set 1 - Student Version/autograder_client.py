@@ -0,0 +1,45 @@
+import argparse
+import json
+import socket
+import sys
+
+# A thin client for the autograder daemon (started with "python autograder.py --serve autograder.sock")
+# It avoids importing the problem set so the grading starts immediately
+# Any other option (e.g. --jobs) is forwarded to the autograder as is
+# The client exits with the exit status of the request, which the daemon sends as the last line after this prefix (see autograder.py)
+EXIT_STATUS_PREFIX = b"\0exit "
+
+
+def main(args: argparse.Namespace, forwarded: list) -> int:
+    argv = ["--question", args.question, *forwarded]
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(args.socket)
+    client.sendall((json.dumps({"argv": argv}) + "\n").encode())
+    pending = b""  # The bytes held back since they may be the start of the status line
+    while True:
+        chunk = client.recv(1 << 16)
+        if not chunk:
+            break
+        pending += chunk
+        start = pending.rfind(b"\0")
+        if start == -1:
+            start = len(pending)
+        sys.stdout.buffer.write(pending[:start])
+        sys.stdout.flush()
+        pending = pending[start:]
+    client.close()
+    if pending.startswith(EXIT_STATUS_PREFIX):
+        return int(pending[len(EXIT_STATUS_PREFIX):])
+    sys.stdout.buffer.write(pending)
+    return 1  # The daemon closed the connection without sending the status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Sends a grading request to a running autograder daemon")
+    parser.add_argument("--socket", "-s", default="autograder.sock",
+                        help="the unix socket on which the daemon is listening")
+    parser.add_argument("--question", "-q", default="all",
+                        help="choose the question(s) to include in the grading (or prefix with ~ to exclude)")
+    args, forwarded = parser.parse_known_args()
+    sys.exit(main(args, forwarded))
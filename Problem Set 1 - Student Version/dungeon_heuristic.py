@@ -1,6 +1,4 @@
-import networkx as nx
 from itertools import combinations
-import numpy as np
 from dungeon import DungeonProblem, DungeonState
 from mathutils import Direction, euclidean_distance, manhattan_distance
 from problem import Problem
@@ -36,6 +34,8 @@ def bfs(start, end, walkable):  # bfs function but betwwen points
 
 
 def build_adj_matrix(problem, initial_state, remaining_coins):
+    # numpy is imported here (instead of the top of the module) so that only the strong heuristic pays for importing it
+    import numpy as np
     # check if we are in the initial_state we build the adj_matrix for coins and save it in cache
     if initial_state != remaining_coins:
         coins_indices = {c: i for i, c in enumerate(
@@ -66,6 +66,7 @@ def build_adj_matrix(problem, initial_state, remaining_coins):
 
 def get_distance_from_mst(adj_matrix):
     # we build mst for the coins to get the minimum distance that span all the coins
+    import networkx as nx  # imported on first use like numpy in build_adj_matrix
     G = nx.from_numpy_matrix(adj_matrix)
     mst = nx.minimum_spanning_tree(G)
     return sum(e[2]['weight'] for e in mst.edges(data=True))
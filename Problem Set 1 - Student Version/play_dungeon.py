@@ -2,7 +2,6 @@ from typing import List
 from dungeon import DungeonProblem, Direction, DungeonState, DungeonTile
 from agents import HumanAgent, UninformedSearchAgent, InformedSearchAgent
 from helpers.utils import fetch_tracked_call_count
-from helpers.heuristic_checks import test_heuristic_consistency
 from functools import lru_cache
 import argparse, time
 
@@ -63,6 +62,7 @@ def create_agent(args: argparse.Namespace):
         heuristic = lru_cache(2**16)(get_heuristic(args.heuristic))
         # If desired by the user, we track every transition and check for the heuristic consistency for each transition
         if args.checks:
+            from helpers.heuristic_checks import test_heuristic_consistency
             DungeonProblem.get_successor = test_heuristic_consistency(heuristic)(DungeonProblem.get_successor)
         return InformedSearchAgent(AStarSearch, heuristic)
     if agent_type == "gbfs":
@@ -71,6 +71,7 @@ def create_agent(args: argparse.Namespace):
         heuristic = lru_cache(2**16)(get_heuristic(args.heuristic))
         # If desired by the user, we track every transition and check for the heuristic consistency for each transition
         if args.checks:
+            from helpers.heuristic_checks import test_heuristic_consistency
             DungeonProblem.get_successor = test_heuristic_consistency(heuristic)(DungeonProblem.get_successor)
         return InformedSearchAgent(BestFirstSearch, heuristic)
     print(f"Requested Agent '{agent_type}' is invalid")
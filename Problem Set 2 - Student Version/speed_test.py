@@ -1,11 +1,13 @@
 import time
+import sys
 
 # This speed test approximates PI
 # by integrating the arc length of the function sqrt(1 - x^2) over x in [0, 1] to get PI/2
+# The number of steps can be passed as an argument (the autograder uses fewer steps to calibrate the time-limits)
 
 start = time.time()
 
-steps = int(1e7)
+steps = int(sys.argv[1]) if len(sys.argv) > 1 else int(1e7)
 arc_length = 0
 
 x, y = 0, 1
@@ -29,9 +29,13 @@ def track_call_count(fn):
     deco.calls = 0
     return deco
 
+# The number of calls returned by the latest fetch (the autograder reports it as the number of explored nodes)
+latest_fetch: Dict[str, Any] = {"calls": None}
+
 def fetch_tracked_call_count(fn):
     calls = getattr(fn, "calls", 0)
     setattr(fn, "calls", 0)
+    latest_fetch["calls"] = calls
     return calls
 
 def record_calls(fn):
@@ -47,6 +51,7 @@ def record_calls(fn):
 def fetch_recorded_calls(fn):
     calls = getattr(fn, "calls", deque())
     setattr(fn, "calls", deque())
+    latest_fetch["calls"] = len(calls)
     return calls
 
 def add_call_listener(listener):